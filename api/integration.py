@@ -3,9 +3,15 @@ API integration module for pharmacy lookup and data retrieval.
 Handles communication with the mockapi.io pharmacy database with robust error handling and performance features.
 """
 
+import hashlib
 import os
+import json
+import tempfile
+import threading
+import time
 import requests
 import logging
+from collections import Counter
 from typing import Optional, Dict, Any, List
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
@@ -21,6 +27,69 @@ class APIError(Exception):
     """Custom exception for API-related errors."""
     pass
 
+# Translation table that strips common phone number separators so that
+# e.g. "+1-555-123-4567" and "+1 (555) 123 4567" normalize to the same key
+_PHONE_SEPARATOR_TABLE = str.maketrans('', '', '+-. ()')
+
+_DEFAULT_MAX_RETRIES = 3
+
+# Persistent cache shared across processes (e.g. repeated CLI runs), so a
+# fresh process can skip the initial fetch entirely. The filename is keyed
+# by base URL so clients pointed at different hosts never read each
+# other's data.
+_DISK_CACHE_PATH_TMPL = os.path.join(tempfile.gettempdir(), 'pharmesol_pharmacies_cache_{key}.json')
+_DISK_CACHE_TTL = 300
+
+def _disk_cache_path(api_base_url: str) -> str:
+    """Per-host disk cache path for the given API base URL."""
+    key = hashlib.sha1(api_base_url.encode()).hexdigest()[:12]
+    return _DISK_CACHE_PATH_TMPL.format(key=key)
+
+def _build_session(max_retries: int) -> requests.Session:
+    """Create a requests session with the standard retry strategy."""
+    session = requests.Session()
+
+    # Configure retry strategy for resilience. A shorter base backoff with
+    # random jitter recovers quickly from transient failures while avoiding
+    # synchronized retry bursts; Retry-After headers from 429/503 responses
+    # are honored over the computed backoff.
+    retry_strategy = Retry(
+        total=max_retries,
+        status_forcelist=[429, 500, 502, 503, 504],
+        backoff_factor=0.5,
+        backoff_jitter=0.5,
+        respect_retry_after_header=True,
+        allowed_methods=["HEAD", "GET", "OPTIONS"]
+    )
+
+    # Size the pool for many threads sharing this session; pool_block=False
+    # means a burst beyond pool_maxsize opens extra (unpooled) connections
+    # instead of making callers queue
+    adapter = HTTPAdapter(
+        max_retries=retry_strategy,
+        pool_connections=32,
+        pool_maxsize=64,
+        pool_block=False
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    # Make compression negotiation explicit so the JSON payload always
+    # transfers compressed regardless of client defaults
+    session.headers['Accept-Encoding'] = 'gzip, deflate'
+
+    return session
+
+# Shared session so TCP/TLS connections persist across PharmacyLookup
+# instances (e.g. one client per conversation) instead of re-handshaking
+_shared_session: Optional[requests.Session] = None
+
+def _get_shared_session() -> requests.Session:
+    global _shared_session
+    if _shared_session is None:
+        _shared_session = _build_session(_DEFAULT_MAX_RETRIES)
+    return _shared_session
+
 class PharmacyLookup:
     """
     Handles pharmacy data lookup from the external API with comprehensive error handling.
@@ -30,10 +99,11 @@ class PharmacyLookup:
     - Proper error handling and logging
     - Clean data transformation
     - Connection pooling for performance
+    - In-memory TTL caching of the pharmacies collection
     - Health checks and monitoring
     """
-    
-    def __init__(self, api_base_url: Optional[str] = None, timeout: int = 10, max_retries: int = 3):
+
+    def __init__(self, api_base_url: Optional[str] = None, timeout: int = 10, max_retries: int = _DEFAULT_MAX_RETRIES, cache_ttl: int = 30):
         # Use environment variable or provided URL or default
         self.api_base_url = (
             api_base_url or 
@@ -42,24 +112,55 @@ class PharmacyLookup:
         ).rstrip('/')
         self.pharmacies_endpoint = f"{self.api_base_url}/pharmacies"
         self.timeout = timeout
-        
-        # Create session with retry strategy
-        self.session = requests.Session()
-        
-        # Configure retry strategy for resilience
-        retry_strategy = Retry(
-            total=max_retries,
-            status_forcelist=[429, 500, 502, 503, 504],
-            backoff_factor=1,
-            allowed_methods=["HEAD", "GET", "OPTIONS"]
-        )
-        
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        self.session.mount("http://", adapter)
-        self.session.mount("https://", adapter)
-        
+        self.cache_ttl = cache_ttl
+        self._disk_cache_path = _disk_cache_path(self.api_base_url)
+
+        # In-memory cache for the pharmacies collection. The remote data set
+        # rarely changes, so repeated lookups within the TTL window reuse one
+        # fetch instead of paying a network round-trip each time. The lock
+        # ensures only one thread refills an expired cache; the others wait
+        # and reuse its result.
+        self._cache = {'data': None, 'ts': 0.0, 'etag': None}
+        self._cache_lock = threading.Lock()
+
+        # Phone -> pharmacy index rebuilt on each cache refresh, so phone
+        # lookups are O(1) dict hits instead of a scan over every pharmacy
+        self._phone_index: Dict[str, Dict[Any, Any]] = {}
+
+        # Precomputed lowercase columns (structure-of-arrays layout) rebuilt
+        # on cache refresh so search filters avoid per-call .get()/.lower()
+        self._columns: Dict[str, list] = {}
+
+
+        # Reuse the shared pooled session when possible so TLS handshakes
+        # amortize across all instances; only a non-default retry budget
+        # warrants a private session
+        if max_retries == _DEFAULT_MAX_RETRIES:
+            self.session = _get_shared_session()
+            self._owns_session = False
+        else:
+            self.session = _build_session(max_retries)
+            self._owns_session = True
+
+        # Seed the in-memory cache from the cross-process disk cache so a
+        # new process can answer lookups without a network round-trip
+        self._load_disk_cache()
+
+        # Open the TCP/TLS connection in the background so the first real
+        # lookup finds a warm pooled connection instead of paying handshake
+        # latency inline
+        threading.Thread(target=self._warm_connection, daemon=True).start()
+
         logger.info(f"Initialized API client for {self.api_base_url}")
     
+    def _warm_connection(self) -> None:
+        """Establish the pooled connection ahead of the first lookup; best effort."""
+        try:
+            self.session.head(self.api_base_url, timeout=self.timeout)
+        except Exception:
+            # Warmup is purely opportunistic - real requests handle errors
+            pass
+
     def health_check(self) -> bool:
         """
         Check if the API is accessible.
@@ -68,7 +169,8 @@ class PharmacyLookup:
             True if API is healthy, False otherwise
         """
         try:
-            response = self.session.get(
+            # HEAD skips the response body; reachability is all we need here
+            response = self.session.head(
                 self.pharmacies_endpoint,
                 timeout=self.timeout
             )
@@ -77,7 +179,158 @@ class PharmacyLookup:
         except Exception as e:
             logger.warning(f"API health check failed: {e}")
             return False
-    
+
+    def _fetch_pharmacies(self) -> Optional[List[Dict[Any, Any]]]:
+        """
+        Fetch the pharmacies collection, using the in-memory TTL cache.
+
+        Serves the cached list while it is fresh, revalidates with
+        If-None-Match when the API provided an ETag, and falls back to stale
+        cached data if the API becomes unreachable.
+
+        Returns:
+            List of pharmacy dictionaries or None if no data is available
+        """
+        if self._cache_is_fresh():
+            return self._cache['data']
+
+        with self._cache_lock:
+            # Another thread may have refilled the cache while we waited
+            if self._cache_is_fresh():
+                return self._cache['data']
+            return self._refill_cache()
+
+    def _refill_cache(self) -> Optional[List[Dict[Any, Any]]]:
+        """Fetch from the API and rebuild the cache; caller holds the lock."""
+        now = time.monotonic()
+        cached = self._cache['data']
+
+        try:
+            headers = {}
+            if cached is not None and self._cache['etag']:
+                headers['If-None-Match'] = self._cache['etag']
+
+            response = self.session.get(
+                self.pharmacies_endpoint,
+                timeout=self.timeout,
+                headers=headers
+            )
+
+            if response.status_code == 304:
+                # Not modified - the cached copy is still current
+                self._cache['ts'] = now
+                return cached
+
+            response.raise_for_status()
+            raw_data = response.json()
+            if not isinstance(raw_data, list):
+                raise APIError(f"Expected a list of pharmacies, got {type(raw_data).__name__}")
+
+            # Validate and clean data. A well-formed payload (the common
+            # case) is used as-is; only malformed payloads pay for a
+            # filtered copy.
+            if all(isinstance(item, dict) for item in raw_data):
+                pharmacies = raw_data
+            else:
+                pharmacies = [item for item in raw_data if isinstance(item, dict)]
+                logger.warning(f"Skipped {len(raw_data) - len(pharmacies)} invalid pharmacy records")
+
+            etag = response.headers.get('ETag')
+            self._cache = {
+                'data': pharmacies,
+                'ts': now,
+                'etag': etag
+            }
+            self._rebuild_indexes(pharmacies)
+            self._save_disk_cache(pharmacies, etag)
+
+            logger.info(f"Successfully retrieved {len(pharmacies)} pharmacies")
+            return pharmacies
+
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Failed to retrieve pharmacies: {e}")
+        except Exception as e:
+            logger.error(f"Unexpected error retrieving pharmacies: {e}")
+
+        if cached is not None:
+            logger.warning("Serving stale pharmacy data from cache after fetch failure")
+            return cached
+        return None
+
+    def refresh(self) -> Optional[List[Dict[Any, Any]]]:
+        """
+        Force a refetch of the pharmacies collection, bypassing the TTL.
+
+        The stored ETag is still sent, so an unchanged data set costs only a
+        cheap 304 revalidation.
+
+        Returns:
+            The refreshed list of pharmacies, or None if unavailable
+        """
+        with self._cache_lock:
+            self._cache['ts'] = 0.0
+            return self._refill_cache()
+
+    def _rebuild_indexes(self, pharmacies: List[Dict[Any, Any]]) -> None:
+        """Rebuild the phone index and search columns for a fresh data set."""
+        self._phone_index = {
+            self._norm_phone(p['phone']): p
+            for p in pharmacies if p.get('phone')
+        }
+        self._columns = {
+            'name_lc': [(p.get('name') or '').lower() for p in pharmacies],
+            'city_lc': [(p.get('city') or '').lower() for p in pharmacies],
+            'state_lc': [(p.get('state') or '').lower() for p in pharmacies],
+            'state': [p.get('state', 'Unknown') for p in pharmacies],
+            'rx_volume': [p.get('rxVolume') for p in pharmacies],
+        }
+
+    def _load_disk_cache(self) -> None:
+        """Seed the in-memory cache from the disk cache if it is recent enough."""
+        try:
+            with open(self._disk_cache_path, 'r') as f:
+                stored = json.load(f)
+
+            age = time.time() - stored['ts']
+            if not (0 <= age < _DISK_CACHE_TTL) or not isinstance(stored['data'], list):
+                return
+
+            # Translate wall-clock age into the monotonic timeline the
+            # in-memory TTL uses; entries older than cache_ttl revalidate
+            # via ETag on the next fetch
+            self._cache = {
+                'data': stored['data'],
+                'ts': time.monotonic() - age,
+                'etag': stored.get('etag')
+            }
+            self._rebuild_indexes(stored['data'])
+            logger.info(f"Loaded {len(stored['data'])} pharmacies from disk cache")
+        except (OSError, ValueError, KeyError, TypeError):
+            # Missing, corrupt or foreign file - just fetch from the API
+            pass
+
+    def _save_disk_cache(self, pharmacies: List[Dict[Any, Any]], etag: Optional[str]) -> None:
+        """Persist the freshly fetched data set for other processes; best effort."""
+        try:
+            tmp_path = f"{self._disk_cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump({'ts': time.time(), 'etag': etag, 'data': pharmacies}, f)
+            os.replace(tmp_path, self._disk_cache_path)
+        except OSError as e:
+            logger.debug(f"Could not write disk cache: {e}")
+
+    def _cache_is_fresh(self) -> bool:
+        """Check whether the in-memory cache holds data within its TTL."""
+        return (
+            self._cache['data'] is not None
+            and time.monotonic() - self._cache['ts'] < self.cache_ttl
+        )
+
+    @staticmethod
+    def _norm_phone(phone_number: str) -> str:
+        """Normalize a phone number for index lookups."""
+        return phone_number.translate(_PHONE_SEPARATOR_TABLE)
+
     def lookup_pharmacy_by_phone(self, phone_number: str) -> Optional[Dict[Any, Any]]:
         """
         Look up pharmacy by phone number with improved error handling.
@@ -94,29 +347,46 @@ class PharmacyLookup:
         
         try:
             logger.info(f"Looking up pharmacy with phone number: {phone_number}")
-            
-            # Make API request with retry logic
-            response = self.session.get(self.pharmacies_endpoint, timeout=self.timeout)
-            response.raise_for_status()
-            
-            pharmacies = response.json()
-            
-            # Search for pharmacy by phone number
-            for pharmacy in pharmacies:
-                if pharmacy.get('phone') == phone_number:
-                    logger.info(f"Found pharmacy: {pharmacy.get('name', 'Unknown')}")
-                    return pharmacy
-            
+
+            pharmacies = self._fetch_pharmacies()
+            if pharmacies is None:
+                return None
+
+            # O(1) hash lookup against the index built on cache refresh
+            pharmacy = self._phone_index.get(self._norm_phone(phone_number))
+            if pharmacy is not None:
+                logger.info(f"Found pharmacy: {pharmacy.get('name', 'Unknown')}")
+                return pharmacy
+
             logger.info(f"No pharmacy found for phone number: {phone_number}")
             return None
-            
-        except requests.exceptions.RequestException as e:
-            logger.error(f"API request failed: {e}")
-            return None
+
         except Exception as e:
             logger.error(f"Unexpected error during pharmacy lookup: {e}")
             return None
     
+    def batch_lookup(self, phone_numbers: List[str]) -> List[Optional[Dict[Any, Any]]]:
+        """
+        Look up multiple phone numbers in a single pass.
+
+        Warms the cache once, then resolves every number against the phone
+        index, so a batch of N lookups costs one fetch instead of N
+        round-trips.
+
+        Args:
+            phone_numbers: Phone numbers to resolve
+
+        Returns:
+            One pharmacy dictionary (or None) per input number, in order
+        """
+        if self._fetch_pharmacies() is None:
+            return [None] * len(phone_numbers)
+
+        return [
+            self._phone_index.get(self._norm_phone(phone)) if phone else None
+            for phone in phone_numbers
+        ]
+
     def get_all_pharmacies(self) -> Optional[List[Dict[Any, Any]]]:
         """
         Retrieve all pharmacies from the API with robust error handling.
@@ -124,31 +394,14 @@ class PharmacyLookup:
         Returns:
             List of all pharmacies or None if request fails
         """
-        try:
-            logger.debug("Fetching all pharmacies from API")
-            
-            response = self.session.get(self.pharmacies_endpoint, timeout=self.timeout)
-            response.raise_for_status()
-            
-            raw_data = response.json()
-            pharmacies = []
-            
-            # Validate and clean data
-            for item in raw_data:
-                if isinstance(item, dict):
-                    pharmacies.append(item)
-                else:
-                    logger.warning(f"Skipping invalid pharmacy data: {item}")
-            
-            logger.info(f"Successfully retrieved {len(pharmacies)} pharmacies")
-            return pharmacies
-            
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to retrieve pharmacies: {e}")
-            return None
-        except Exception as e:
-            logger.error(f"Unexpected error retrieving pharmacies: {e}")
+        logger.debug("Fetching all pharmacies from API")
+
+        pharmacies = self._fetch_pharmacies()
+        if pharmacies is None:
             return None
+
+        # Return a copy so callers can't mutate the cached list
+        return list(pharmacies)
     
     def find_pharmacy_by_phone(self, phone_number: str) -> Optional[Dict[Any, Any]]:
         """
@@ -173,45 +426,107 @@ class PharmacyLookup:
             List of matching pharmacy dictionaries
         """
         try:
-            all_pharmacies = self.get_all_pharmacies()
+            # With a cold cache, push exact-match predicates to the API as
+            # query parameters so only the matching subset is downloaded.
+            server_filters = {k: v for k, v in filters.items() if k in self._SERVER_FILTERS}
+            if server_filters and not self._cache_is_fresh():
+                remote = self._search_remote(server_filters)
+                if remote:
+                    results = [p for p in remote if self._matches_filters(p, filters)]
+                    logger.info(f"Server-side search returned {len(results)} results")
+                    return results
+                # Empty or failed remote search: fall through to the full
+                # fetch so case-insensitive matching still applies
+
+            all_pharmacies = self._fetch_pharmacies()
             if not all_pharmacies:
                 return []
-            
-            results = []
-            
-            for pharmacy in all_pharmacies:
-                matches = True
-                
-                # Apply filters
-                if 'city' in filters and pharmacy.get('city'):
-                    if pharmacy['city'].lower() != filters['city'].lower():
-                        matches = False
-                
-                if 'state' in filters and pharmacy.get('state'):
-                    if pharmacy['state'].lower() != filters['state'].lower():
-                        matches = False
-                
-                if 'min_volume' in filters and pharmacy.get('rxVolume'):
-                    if pharmacy['rxVolume'] < filters['min_volume']:
-                        matches = False
-                
-                if 'max_volume' in filters and pharmacy.get('rxVolume'):
-                    if pharmacy['rxVolume'] > filters['max_volume']:
-                        matches = False
-                
-                if 'name' in filters and pharmacy.get('name'):
-                    if filters['name'].lower() not in pharmacy['name'].lower():
-                        matches = False
-                
-                if matches:
-                    results.append(pharmacy)
-            
+
+            # Compose a boolean mask over the precomputed columns; each
+            # comprehension is one tight pass instead of per-record branching.
+            # A filter only excludes records that actually carry the field.
+            mask = [True] * len(all_pharmacies)
+
+            if 'city' in filters:
+                city = filters['city'].lower()
+                mask = [m and (not c or c == city)
+                        for m, c in zip(mask, self._columns['city_lc'])]
+
+            if 'state' in filters:
+                state = filters['state'].lower()
+                mask = [m and (not s or s == state)
+                        for m, s in zip(mask, self._columns['state_lc'])]
+
+            if 'min_volume' in filters:
+                min_volume = filters['min_volume']
+                mask = [m and (not v or v >= min_volume)
+                        for m, v in zip(mask, self._columns['rx_volume'])]
+
+            if 'max_volume' in filters:
+                max_volume = filters['max_volume']
+                mask = [m and (not v or v <= max_volume)
+                        for m, v in zip(mask, self._columns['rx_volume'])]
+
+            if 'name' in filters:
+                name = filters['name'].lower()
+                mask = [m and (not n or name in n)
+                        for m, n in zip(mask, self._columns['name_lc'])]
+
+            results = [p for p, m in zip(all_pharmacies, mask) if m]
+
             logger.info(f"Search returned {len(results)} results")
             return results
-            
+
         except Exception as e:
             logger.error(f"Search failed: {e}")
             return []
+
+    # Filters mockapi.io can evaluate server-side as exact-match query params
+    _SERVER_FILTERS = ('city', 'state')
+
+    def _search_remote(self, server_filters: Dict[str, str]) -> Optional[List[Dict[Any, Any]]]:
+        """
+        Run exact-match filters server-side via query parameters.
+
+        Returns:
+            Matching pharmacy dictionaries, or None if the request fails
+        """
+        try:
+            response = self.session.get(
+                self.pharmacies_endpoint,
+                params=server_filters,
+                timeout=self.timeout
+            )
+            response.raise_for_status()
+            return [item for item in response.json() if isinstance(item, dict)]
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"Server-side search failed, falling back to local filtering: {e}")
+            return None
+
+    @staticmethod
+    def _matches_filters(pharmacy: Dict[Any, Any], filters: Dict[str, Any]) -> bool:
+        """Apply search filters to a single pharmacy record."""
+        if 'city' in filters and pharmacy.get('city'):
+            if pharmacy['city'].lower() != filters['city'].lower():
+                return False
+
+        if 'state' in filters and pharmacy.get('state'):
+            if pharmacy['state'].lower() != filters['state'].lower():
+                return False
+
+        if 'min_volume' in filters and pharmacy.get('rxVolume'):
+            if pharmacy['rxVolume'] < filters['min_volume']:
+                return False
+
+        if 'max_volume' in filters and pharmacy.get('rxVolume'):
+            if pharmacy['rxVolume'] > filters['max_volume']:
+                return False
+
+        if 'name' in filters and pharmacy.get('name'):
+            if filters['name'].lower() not in pharmacy['name'].lower():
+                return False
+
+        return True
     
     def get_api_stats(self) -> dict:
         """
@@ -221,7 +536,7 @@ class PharmacyLookup:
             Dictionary with API statistics
         """
         try:
-            pharmacies = self.get_all_pharmacies()
+            pharmacies = self._fetch_pharmacies()
             if not pharmacies:
                 return {
                     'total_pharmacies': 0,
@@ -232,36 +547,32 @@ class PharmacyLookup:
                 }
             
             total_count = len(pharmacies)
-            by_type = {}
-            by_state = {}
+
+            # Run the aggregation over the precomputed columns (rebuilt with
+            # each cache refresh) instead of per-record dict lookups
+            volumes = self._columns.get('rx_volume') or [p.get('rxVolume') for p in pharmacies]
+            states = self._columns.get('state') or [p.get('state', 'Unknown') for p in pharmacies]
+
+            by_type = Counter()
             total_volume = 0
-            
-            for pharmacy in pharmacies:
-                # Count by volume type (categorize based on rx volume)
-                rx_volume = pharmacy.get('rxVolume', 0)
+            for rx_volume in volumes:
+                rx_volume = rx_volume or 0
                 if rx_volume >= 10000:
-                    pharmacy_type = 'high_volume'
+                    by_type['high_volume'] += 1
                 elif rx_volume >= 5000:
-                    pharmacy_type = 'medium_volume'
+                    by_type['medium_volume'] += 1
                 elif rx_volume >= 1000:
-                    pharmacy_type = 'low_volume'
+                    by_type['low_volume'] += 1
                 else:
-                    pharmacy_type = 'startup'
-                
-                by_type[pharmacy_type] = by_type.get(pharmacy_type, 0) + 1
-                
-                # Count by state
-                state = pharmacy.get('state', 'Unknown')
-                by_state[state] = by_state.get(state, 0) + 1
-                
-                # Sum volume
-                if rx_volume:
-                    total_volume += rx_volume
-            
+                    by_type['startup'] += 1
+                total_volume += rx_volume
+
+            by_state = Counter(states)
+
             return {
                 'total_pharmacies': total_count,
-                'by_type': by_type,
-                'by_state': by_state,
+                'by_type': dict(by_type),
+                'by_state': dict(by_state),
                 'total_rx_volume': total_volume,
                 'average_rx_volume': total_volume / total_count if total_count > 0 else 0
             }
@@ -308,8 +619,8 @@ class PharmacyLookup:
         return self.search_pharmacies(**filters)
     
     def close(self):
-        """Clean up the session."""
-        if hasattr(self, 'session'):
+        """Clean up the session (no-op for the shared pooled session)."""
+        if getattr(self, '_owns_session', False):
             self.session.close()
             logger.debug("API client session closed")
     
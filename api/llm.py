@@ -4,9 +4,13 @@ Handles conversation flow and LLM API calls.
 """
 
 import os
+import hashlib
 import logging
 import json
-from typing import Dict, List, Optional, Any
+import re
+from collections import OrderedDict, deque
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Any
 from openai import OpenAI
 from dotenv import load_dotenv
 
@@ -15,15 +19,57 @@ load_dotenv()
 from utils.prompt import (
     SYSTEM_PROMPT, KNOWN_PHARMACY_TEMPLATE, UNKNOWN_PHARMACY_TEMPLATE,
     format_location_info, format_rx_volume_info, CONVERSATION_PROMPTS,
-    EMAIL_TEMPLATES, get_rx_volume_benefits, LLM_EXTRACTION_SYSTEM_PROMPT,
-    get_extraction_prompt
+    EMAIL_TEMPLATES, get_rx_volume_benefits
+)
+from utils.function_calls import (
+    TOOL_SCHEMAS, send_email, schedule_callback, log_lead_information,
+    create_follow_up_task
 )
-from utils.function_calls import send_email, schedule_callback, log_lead_information, create_follow_up_task
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Single combined keyword matcher: one scan classifies the message, with
+# named groups telling the intents apart.
+_INTENT_RE = re.compile(
+    r'(?P<email>email|send me|mail me)|(?P<callback>callback|call back|call me|schedule)',
+    re.IGNORECASE
+)
+# Character-class based so trailing punctuation ("mail me at x@y.com.")
+# is not swallowed into the captured address
+_EMAIL_RE = re.compile(r'[A-Za-z0-9._%+\-]+@[A-Za-z0-9.\-]+\.[A-Za-z]{2,}')
+
+# Cap on how many turns are kept verbatim and replayed to the LLM; older
+# turns are folded into a compact running summary instead
+_HISTORY_MAXLEN = 20
+
+# Character budget for replayed history (~2000 tokens at the usual ~4 chars
+# per token). Protects against a few very long messages blowing the prompt
+# past what the turn-count cap alone would allow.
+_HISTORY_CHAR_BUDGET = 8000
+
+# Response caching only makes sense when sampling is (near-)deterministic;
+# at higher temperatures identical prompts legitimately produce varied replies
+_CACHEABLE_TEMPERATURE = 0.2
+_RESPONSE_CACHE_MAX = 128
+
+_TECH_DIFFICULTIES_MSG = (
+    "I apologize, but I'm experiencing some technical difficulties. Let me take down "
+    "your information manually and have someone from our team reach out to you."
+)
+
+@lru_cache(maxsize=256)
+def _build_known_greeting(pharmacy_name: str, city: Optional[str], state: Optional[str],
+                          rx_volume: Optional[int]) -> str:
+    """Build the known-pharmacy greeting, memoized on the scalar fields."""
+    data = {'city': city, 'state': state, 'rxVolume': rx_volume}
+    return KNOWN_PHARMACY_TEMPLATE.format(
+        pharmacy_name=pharmacy_name,
+        location_info=format_location_info(data),
+        rx_volume_info=format_rx_volume_info(data)
+    )
+
 class PharmacyChatbot:
     """Main chatbot class handling LLM interactions and conversation flow."""
     
@@ -38,14 +84,30 @@ class PharmacyChatbot:
         if not self.api_key:
             raise ValueError("OpenAI API key is required. Set OPENAI_API_KEY environment variable or pass it directly.")
         
-        # Get model from environment variable
+        # Get model and sampling temperature from environment variables
         self.openai_model = os.getenv('OPENAI_MODEL', 'gpt-4o-mini')
-        
+        self.temperature = float(os.getenv('OPENAI_TEMPERATURE', '0.7'))
+
+        # LRU cache of plain (non-tool) responses, active only at low
+        # temperature where repeating a prompt should repeat the reply
+        self._response_cache: OrderedDict = OrderedDict()
+
         self.client = OpenAI(api_key=self.api_key)
-        self.conversation_history = []
+        self.conversation_history = deque(maxlen=_HISTORY_MAXLEN)
+        self._history_summary = ""
+        self._message_count = 0
         self.pharmacy_data = None
         self.lead_data = {}
-        
+        self._actions = []
+
+        # Invariant pieces of the system message, computed once instead of
+        # being rebuilt on every turn
+        self._system_prefix = f"{SYSTEM_PROMPT}\n\nCURRENT CONTEXT:\n"
+        self._pharmacy_context = ""
+        self._phone_context = ""
+        self._static_system = self._system_prefix
+
+
     def start_conversation(self, phone_number: str, pharmacy_data: Optional[Dict] = None) -> str:
         """
         Start a new conversation with initial greeting.
@@ -59,8 +121,26 @@ class PharmacyChatbot:
         """
         self.phone_number = phone_number
         self.pharmacy_data = pharmacy_data
-        self.conversation_history = []
-        
+        self.conversation_history = deque(maxlen=_HISTORY_MAXLEN)
+        self._history_summary = ""
+        self._message_count = 0
+        self._actions = []
+
+        # Pharmacy data and phone number are fixed for the whole session, so
+        # serialize them once; sort_keys keeps the string byte-stable
+        self._pharmacy_context = (
+            f"KNOWN PHARMACY DATA: {json.dumps(pharmacy_data, sort_keys=True)}\n"
+            if pharmacy_data else ""
+        )
+        self._phone_context = f"CALLER PHONE NUMBER: {phone_number}"
+
+        # Frozen for the whole session. Keeping this byte-identical at the
+        # head of every request lets the API's prompt-prefix cache skip
+        # reprocessing it; per-turn context rides in a trailing system
+        # message instead (see _dynamic_context)
+        self._static_system = self._system_prefix + self._pharmacy_context + self._phone_context
+
+
         # Create initial greeting based on whether pharmacy is known
         if pharmacy_data:
             greeting = self._create_known_pharmacy_greeting(pharmacy_data)
@@ -68,20 +148,18 @@ class PharmacyChatbot:
             greeting = self._create_unknown_pharmacy_greeting()
         
         # Add greeting to conversation history
-        self.conversation_history.append({"role": "assistant", "content": greeting})
+        self._append_history("assistant", greeting)
         
         return greeting
     
     def _create_known_pharmacy_greeting(self, pharmacy_data: Dict) -> str:
         """Create greeting for known pharmacy."""
-        pharmacy_name = pharmacy_data.get('name', 'your pharmacy')
-        location_info = format_location_info(pharmacy_data)
-        rx_volume_info = format_rx_volume_info(pharmacy_data)
-        
-        return KNOWN_PHARMACY_TEMPLATE.format(
-            pharmacy_name=pharmacy_name,
-            location_info=location_info,
-            rx_volume_info=rx_volume_info
+        # Repeat callers from the same pharmacy hit the memoized builder
+        return _build_known_greeting(
+            pharmacy_data.get('name', 'your pharmacy'),
+            pharmacy_data.get('city'),
+            pharmacy_data.get('state'),
+            pharmacy_data.get('rxVolume')
         )
     
     def _create_unknown_pharmacy_greeting(self) -> str:
@@ -91,130 +169,240 @@ class PharmacyChatbot:
     def process_user_message(self, user_message: str) -> str:
         """
         Process user message and generate appropriate response.
-        
+
+        Intent detection and response generation share a single LLM request:
+        the model either answers directly or asks for one of the registered
+        tools (email, callback, lead logging), so the common turn costs one
+        network round-trip instead of two.
+
         Args:
             user_message: Message from the user
-            
+
         Returns:
             Chatbot response
         """
         # Add user message to conversation history
-        self.conversation_history.append({"role": "user", "content": user_message})
-        
-        # Use LLM to extract intent and information from the message
-        extracted_info = self._extract_message_information(user_message)
-        
-        # Handle different intents based on LLM extraction
-        if extracted_info.get('intent') == 'email_request':
-            return self._handle_email_request(user_message, extracted_info)
-        elif extracted_info.get('intent') == 'callback_request':
-            return self._handle_callback_request(user_message, extracted_info)
-        elif extracted_info.get('has_contact_info'):
-            self._update_lead_information(extracted_info)
-        
-        # Generate response using LLM
-        response = self._generate_llm_response()
-        
-        # Add response to conversation history
-        self.conversation_history.append({"role": "assistant", "content": response})
-        
-        return response
-    
-    def _generate_llm_response(self) -> str:
-        """Generate response using OpenAI LLM."""
+        self._append_history("user", user_message)
+
+        # Scan for an email address once; shared by the tool and fallback paths
+        email_match = _EMAIL_RE.search(user_message)
+
+        messages = self._build_llm_messages()
+
+        # At low temperature identical prompts should yield identical
+        # replies, so a repeated prompt can skip the network entirely
+        cache_key = self._response_cache_key(messages) if self.temperature <= _CACHEABLE_TEMPERATURE else None
+        if cache_key is not None and cache_key in self._response_cache:
+            self._response_cache.move_to_end(cache_key)
+            response_text = self._response_cache[cache_key]
+            self._append_history("assistant", response_text)
+            return response_text
+
         try:
-            # Prepare system message with context
-            system_message = self._prepare_system_message()
-            
-            # Prepare messages for LLM
-            messages = [{"role": "system", "content": system_message}] + self.conversation_history
-            
-            # Make LLM API call
             response = self.client.chat.completions.create(
                 model=self.openai_model,
                 messages=messages,
+                tools=TOOL_SCHEMAS,
                 max_tokens=500,
-                temperature=0.7
+                temperature=self.temperature
             )
-            
-            return response.choices[0].message.content.strip()
-            
+            message = response.choices[0].message
+
+            if message.tool_calls:
+                calls = [(tc.function.name, self._parse_tool_args(tc.function.arguments))
+                         for tc in message.tool_calls]
+                return self._dispatch_tool_calls(calls, user_message, email_match)
+
+            response_text = message.content.strip()
+
         except Exception as e:
             logger.error(f"LLM API call failed: {e}")
-            return "I apologize, but I'm experiencing some technical difficulties. Let me take down your information manually and have someone from our team reach out to you."
-    
-    def _prepare_system_message(self) -> str:
-        """Prepare system message with current context."""
-        context_info = []
-        
-        if self.pharmacy_data:
-            context_info.append(f"KNOWN PHARMACY DATA: {self.pharmacy_data}")
-        
-        if self.lead_data:
-            context_info.append(f"COLLECTED LEAD DATA: {self.lead_data}")
-        
-        context_info.append(f"CALLER PHONE NUMBER: {self.phone_number}")
-        
-        context = "\n".join(context_info) if context_info else ""
-        
-        return f"{SYSTEM_PROMPT}\n\nCURRENT CONTEXT:\n{context}"
+            return self._handle_message_fallback(user_message, email_match)
+
+        # Only plain responses are cached; tool turns have side effects
+        if cache_key is not None:
+            self._response_cache[cache_key] = response_text
+            if len(self._response_cache) > _RESPONSE_CACHE_MAX:
+                self._response_cache.popitem(last=False)
+
+        # Add response to conversation history
+        self._append_history("assistant", response_text)
+
+        return response_text
+
+    @staticmethod
+    def _response_cache_key(messages: List[Dict[str, str]]) -> str:
+        """Hash the full prompt into a compact cache key."""
+        digest = hashlib.blake2b(digest_size=16)
+        for message in messages:
+            digest.update(message["role"].encode())
+            digest.update(b'\x00')
+            digest.update(message["content"].encode())
+            digest.update(b'\x00')
+        return digest.hexdigest()
+
+    @staticmethod
+    def _parse_tool_args(arguments: Optional[str]) -> Dict[str, Any]:
+        """Parse a tool call's JSON arguments, tolerating malformed output."""
+        try:
+            return json.loads(arguments or '{}')
+        except json.JSONDecodeError:
+            return {}
+
+    def _dispatch_tool_calls(self, calls, user_message: str,
+                             email_match: Optional[re.Match]) -> str:
+        """Execute the (name, args) tool calls the model requested and build the reply."""
+        responses = []
+
+        for name, args in calls:
+            if name == 'send_email':
+                extracted = {'contact_info': {'email': args.get('recipient_email')}}
+                responses.append(self._handle_email_request(user_message, extracted, email_match))
+            elif name == 'schedule_callback':
+                extracted = {'scheduling_preference': args.get('preferred_time', '')}
+                responses.append(self._handle_callback_request(user_message, extracted))
+            elif name == 'log_lead_information':
+                self._update_lead_information({
+                    'contact_info': {
+                        'email': args.get('email'),
+                        'phone': args.get('phone'),
+                        'name': args.get('name')
+                    },
+                    'pharmacy_info': {
+                        'name': args.get('pharmacy_name'),
+                        'location': args.get('location'),
+                        'rx_volume': args.get('rx_volume')
+                    }
+                })
+            else:
+                logger.warning(f"Model requested unknown tool: {name}")
+
+        if responses:
+            return " ".join(responses)
+
+        # Only lead logging happened; keep the conversation moving
+        return CONVERSATION_PROMPTS['suggest_next_steps']
+
+    def _handle_message_fallback(self, user_message: str,
+                                 email_match: Optional[re.Match] = None) -> str:
+        """Keyword-routed handling used when the LLM round-trip fails."""
+        intent = self._determine_intent_fallback(user_message)
+        if intent == 'email_request':
+            return self._handle_email_request(user_message, None, email_match)
+        elif intent == 'callback_request':
+            return self._handle_callback_request(user_message)
+        return _TECH_DIFFICULTIES_MSG
     
-    def _extract_message_information(self, message: str) -> Dict[str, Any]:
+    def process_user_message_stream(self, user_message: str) -> Iterator[str]:
         """
-        Use LLM to extract intent and information from user message.
-        
+        Process a user message, yielding the response incrementally.
+
+        Streams LLM tokens as they arrive so callers can render output at
+        time-to-first-token latency instead of waiting for the full
+        completion. Action-handling turns (email/callback) yield their single
+        response message. The complete response is recorded in the
+        conversation history once the stream is exhausted.
+
         Args:
-            message: User message to analyze
-            
-        Returns:
-            Dictionary containing extracted information and intent
+            user_message: Message from the user
+
+        Yields:
+            Response text chunks
         """
-        extraction_prompt = get_extraction_prompt(message)
-        
+        # Add user message to conversation history
+        self._append_history("user", user_message)
+
+        # Scan for an email address once, shared with the email handler
+        email_match = _EMAIL_RE.search(user_message)
+
         try:
-            response = self.client.chat.completions.create(
+            stream = self.client.chat.completions.create(
                 model=self.openai_model,
-                messages=[
-                    {"role": "system", "content": LLM_EXTRACTION_SYSTEM_PROMPT},
-                    {"role": "user", "content": extraction_prompt}
-                ],
-                max_tokens=300,
-                temperature=0.1
+                messages=self._build_llm_messages(),
+                tools=TOOL_SCHEMAS,
+                max_tokens=500,
+                temperature=self.temperature,
+                stream=True
             )
-            
-            extracted_json = response.choices[0].message.content.strip()
-            
-            # Try to parse JSON, fallback to basic structure if parsing fails
-            try:
-                return json.loads(extracted_json)
-            except json.JSONDecodeError:
-                logger.warning(f"Failed to parse LLM extraction JSON: {extracted_json}")
-                return self._fallback_extraction(message)
-                
+
+            parts = []
+            # Tool calls arrive as fragments keyed by index; reassemble the
+            # name and argument JSON before dispatching
+            pending_calls: Dict[int, Dict[str, Any]] = {}
+
+            for chunk in stream:
+                delta = chunk.choices[0].delta
+                if delta.tool_calls:
+                    for fragment in delta.tool_calls:
+                        entry = pending_calls.setdefault(fragment.index, {'name': '', 'args': []})
+                        if fragment.function.name:
+                            entry['name'] = fragment.function.name
+                        if fragment.function.arguments:
+                            entry['args'].append(fragment.function.arguments)
+                elif delta.content:
+                    parts.append(delta.content)
+                    yield delta.content
+
+            if pending_calls:
+                calls = [(entry['name'], self._parse_tool_args(''.join(entry['args'])))
+                         for _, entry in sorted(pending_calls.items())]
+                yield self._dispatch_tool_calls(calls, user_message, email_match)
+                return
+
         except Exception as e:
-            logger.error(f"LLM extraction failed: {e}")
-            return self._fallback_extraction(message)
-    
-    def _fallback_extraction(self, message: str) -> Dict[str, Any]:
-        """Fallback extraction using keyword matching if LLM fails."""
-        return {
-            "intent": self._determine_intent_fallback(message),
-            "has_contact_info": '@' in message or any(c.isdigit() for c in message),
-            "contact_info": {},
-            "pharmacy_info": {},
-            "scheduling_preference": "",
-            "specific_requests": []
-        }
+            logger.error(f"LLM API call failed: {e}")
+            yield self._handle_message_fallback(user_message, email_match)
+            return
+
+        self._append_history("assistant", "".join(parts))
+
+    def _append_history(self, role: str, content: str) -> None:
+        """Append a message, folding the oldest turn into the summary when full."""
+        self._message_count += 1
+        if len(self.conversation_history) == _HISTORY_MAXLEN:
+            evicted = self.conversation_history[0]
+            self._history_summary += f"{evicted['role']}: {evicted['content']}\n"
+        self.conversation_history.append({"role": role, "content": content})
+
+    def _dynamic_context(self) -> str:
+        """Build the per-turn context (lead data, history summary), if any."""
+        lead_context = f"COLLECTED LEAD DATA: {self.lead_data}\n" if self.lead_data else ""
+        summary_context = (
+            f"EARLIER CONVERSATION (summarized): {self._history_summary}\n"
+            if self._history_summary else ""
+        )
+        return lead_context + summary_context
+
+    def _trimmed_history(self) -> List[Dict[str, str]]:
+        """Most recent messages fitting the character budget, oldest first."""
+        kept: deque = deque()
+        total = 0
+        for message in reversed(self.conversation_history):
+            total += len(message["content"])
+            if total > _HISTORY_CHAR_BUDGET and kept:
+                break
+            kept.appendleft(message)
+        return list(kept)
+
+    def _build_llm_messages(self) -> List[Dict[str, str]]:
+        """Assemble the message list: stable prefix, history, then per-turn context."""
+        messages = [{"role": "system", "content": self._static_system}, *self._trimmed_history()]
+        dynamic = self._dynamic_context()
+        if dynamic:
+            messages.append({"role": "system", "content": dynamic})
+        return messages
     
     def _determine_intent_fallback(self, message: str) -> str:
         """Fallback intent detection using keywords."""
-        message_lower = message.lower()
-        if any(keyword in message_lower for keyword in ['email', 'send me', 'mail me']):
-            return "email_request"
-        elif any(keyword in message_lower for keyword in ['callback', 'call back', 'call me', 'schedule']):
-            return "callback_request"
-        else:
-            return "general_inquiry"
+        # One pass over the message; an email keyword anywhere still beats an
+        # earlier callback keyword, preserving the old priority order
+        found_callback = False
+        for match in _INTENT_RE.finditer(message):
+            if match.lastgroup == 'email':
+                return "email_request"
+            found_callback = True
+
+        return "callback_request" if found_callback else "general_inquiry"
     
     def _update_lead_information(self, extracted_info: Dict[str, Any]) -> None:
         """Update lead information from LLM extraction."""
@@ -238,21 +426,20 @@ class PharmacyChatbot:
             self.lead_data['rx_volume'] = pharmacy_info['rx_volume']
     
     
-    def _handle_email_request(self, message: str, extracted_info: Dict[str, Any] = None) -> str:
+    def _handle_email_request(self, message: str, extracted_info: Dict[str, Any] = None,
+                              email_match: Optional[re.Match] = None) -> str:
         """Handle email information request."""
         # Get email from LLM extraction first, then fallback to previous methods
         email = None
         if extracted_info and extracted_info.get('contact_info', {}).get('email'):
             email = extracted_info['contact_info']['email']
-        
-        # Fallback: try to extract email from current message
+
+        # Fallback: the regex match precomputed by the caller, or our own scan
         if not email:
-            words = message.split()
-            for word in words:
-                if '@' in word and '.' in word:
-                    email = word
-                    break
-        
+            match = email_match or _EMAIL_RE.search(message)
+            if match:
+                email = match.group()
+
         # If no email in current message, check if we have one stored from previous messages
         if not email and self.lead_data.get('email'):
             email = self.lead_data['email']
@@ -286,7 +473,8 @@ class PharmacyChatbot:
         
         # Send email using mock function
         send_email(email, subject, body)
-        
+        self._actions.append("email_sent")
+
         # Log the lead if new
         if not self.pharmacy_data:
             self.lead_data['email'] = email
@@ -321,9 +509,10 @@ class PharmacyChatbot:
             phone_number=self.phone_number,
             preferred_time=preferred_time,
             contact_name=contact_name,
-            notes=f"Interested in Pharmesol services. Conversation context: {len(self.conversation_history)} messages exchanged."
+            notes=f"Interested in Pharmesol services. Conversation context: {self._message_count} messages exchanged."
         )
-        
+        self._actions.append("callback_scheduled")
+
         # Create follow-up task
         contact_info = {"phone": self.phone_number}
         if self.lead_data.get('email'):
@@ -341,7 +530,7 @@ class PharmacyChatbot:
             pharmacy_name = self.lead_data.get('pharmacy_name', 'your pharmacy')
         
         closing = CONVERSATION_PROMPTS['closing'].format(pharmacy_name=pharmacy_name)
-        self.conversation_history.append({"role": "assistant", "content": closing})
+        self._append_history("assistant", closing)
         
         return closing
     
@@ -351,20 +540,10 @@ class PharmacyChatbot:
             "phone_number": self.phone_number,
             "pharmacy_data": self.pharmacy_data,
             "lead_data": self.lead_data,
-            "conversation_length": len(self.conversation_history),
+            "conversation_length": self._message_count,
             "actions_taken": self._get_actions_taken()
         }
     
     def _get_actions_taken(self) -> List[str]:
         """Get list of actions taken during conversation."""
-        actions = []
-        
-        for message in self.conversation_history:
-            if message["role"] == "assistant":
-                content = message["content"].lower()
-                if "sent detailed information" in content or "email" in content:
-                    actions.append("email_sent")
-                if "scheduled a callback" in content or "callback" in content:
-                    actions.append("callback_scheduled")
-        
-        return actions
\ No newline at end of file
+        return list(self._actions)
\ No newline at end of file
@@ -4,16 +4,115 @@ Provides structured, testable, and maintainable action execution.
 """
 
 import logging
-from typing import Dict, Any, Optional
+import sys
+import time
+from bisect import bisect_right
+from collections import Counter, deque
+from itertools import islice
+from typing import Dict, Any, Final, NamedTuple, Optional
 from datetime import datetime, timedelta
 from core.models import ConversationState, PharmacyType
 from utils.function_calls import send_email, schedule_callback, log_lead_information, create_follow_up_task
 
 logger = logging.getLogger(__name__)
 
+# Volume cut-points and the tier on either side of each, so volume→tier
+# is a bisect instead of chained comparisons
+_VOLUME_THRESHOLDS = (5000, 10000)
+_VOLUME_TYPES = (PharmacyType.LOW_VOLUME, PharmacyType.MEDIUM_VOLUME, PharmacyType.HIGH_VOLUME)
+
+# Benefits copy per pharmacy tier, built once at import instead of on
+# every email send
+_BENEFITS_MAP: Dict[PharmacyType, str] = {
+    PharmacyType.HIGH_VOLUME: """• Premium tier pricing with significant volume discounts
+            • Dedicated account manager for personalized service
+            • Priority inventory allocation and emergency delivery
+            • Advanced inventory management tools and reporting
+            • Flexible payment terms and credit options""",
+
+    PharmacyType.MEDIUM_VOLUME: """• Volume-based pricing tiers with competitive rates
+            • Reliable delivery scheduling (2-3 times per week)
+            • Account management support and regular check-ins
+            • Inventory optimization assistance
+            • Emergency delivery services when needed""",
+
+    PharmacyType.LOW_VOLUME: """• Competitive pricing structure designed for growing pharmacies
+            • Flexible delivery options (weekly or bi-weekly)
+            • Growth-oriented service packages
+            • Inventory management support
+            • No minimum order requirements to start""",
+
+    PharmacyType.STARTUP: """• Startup-friendly pricing with room to grow
+            • Flexible minimum order requirements
+            • Business development support and guidance
+            • Scalable solutions that adapt to your growth
+            • Educational resources for pharmacy operations"""
+}
+
+# Email bodies as module-level templates so each send only fills in the
+# per-pharmacy fields instead of rebuilding the whole multi-line literal
+_EXISTING_PHARMACY_BODY = """Dear {contact},
+
+        Thank you for reaching out to us today. It's always great to hear from {pharmacy_name}.
+
+        Based on our conversation and your {rx_volume} monthly prescription volume, here's how Pharmesol can specifically support your pharmacy:
+
+        {benefits}
+
+        Our team understands the unique challenges facing pharmacies in {location}, and we're committed to providing solutions that help you serve your community better.
+
+        I'll be preparing detailed pricing information tailored to your volume and will follow up within the next business day.
+
+        Thank you for considering Pharmesol as your distribution partner.
+
+        Best regards,
+        Pharmesol Sales Team
+        Phone: (555) 123-4567
+        Email: sales@pharmesol.com"""
+
+_NEW_LEAD_BODY = """Dear {contact},
+
+        Thank you for your interest in Pharmesol's pharmaceutical distribution services.
+
+        Based on our conversation about {pharmacy_name}, here's what we can offer:
+
+        {benefits}
+
+        We're excited about the opportunity to support {pharmacy_name}'s success and help you better serve your community.
+
+        Our team will follow up within the next few business days to discuss specific pricing and service details tailored to your needs.
+
+        Best regards,
+        Pharmesol Sales Team
+        Phone: (555) 123-4567
+        Email: sales@pharmesol.com"""
+
+# Canned email-request prompts; index 0 is the default, index 1 is used
+# later in a conversation (see _handle_ask_for_email). Interned so these
+# fixed responses stay single shared objects for their lifetime.
+_ASK_FOR_EMAIL_MESSAGES: Final = tuple(sys.intern(msg) for msg in (
+    "I'd be happy to send you detailed information about our services! Could you please provide your email address so I can send you everything {pharmacy_name} needs to know about Pharmesol?",
+    "To send you our comprehensive service information, I'll need your email address. What's the best email to reach you at?",
+    "I'd love to get you all the details about how Pharmesol can support your pharmacy. What email address should I send the information to?"
+))
+
+_CALLBACK_ASK_MSG: Final = sys.intern(
+    "I'd be happy to schedule a callback for you! What time works best - would you prefer morning or afternoon, and which day this week?"
+)
+
+class ActionRecord(NamedTuple):
+    """History entry for one executed action; lighter than a per-entry dict."""
+    action: str
+    timestamp: datetime
+    success: bool
+    details: Dict[str, Any]
+
 class ActionResult:
     """Result of an action execution."""
-    
+
+    # One of these is allocated per action call; slots keep them small
+    __slots__ = ('success', 'message', 'data', 'timestamp')
+
     def __init__(self, success: bool, message: str, data: Optional[Dict] = None):
         self.success = success
         self.message = message
@@ -31,8 +130,12 @@ class ActionHandler:
     making the system more testable and maintainable.
     """
     
+    # Cap on retained history entries; old entries fall off the front so
+    # long-running sessions don't grow without bound
+    _HISTORY_MAXLEN = 1000
+
     def __init__(self):
-        self.action_history = []
+        self.action_history = deque(maxlen=self._HISTORY_MAXLEN)
     
     def execute_action(self, action_type: str, state: ConversationState, **kwargs) -> ActionResult:
         """
@@ -47,30 +150,21 @@ class ActionHandler:
             ActionResult indicating success/failure and details
         """
         logger.info(f"Executing action: {action_type}")
-        
-        action_map = {
-            'send_email': self._handle_send_email,
-            'schedule_callback': self._handle_schedule_callback,
-            'log_lead': self._handle_log_lead,
-            'create_follow_up': self._handle_create_follow_up,
-            'ask_for_email': self._handle_ask_for_email,
-            'ask_for_callback_details': self._handle_ask_for_callback_details
-        }
-        
-        if action_type not in action_map:
+
+        handler = self._ACTIONS.get(action_type)
+        if handler is None:
             return ActionResult(
                 success=False,
                 message=f"Unknown action type: {action_type}"
             )
-        
+
         try:
-            result = action_map[action_type](state, **kwargs)
-            self.action_history.append({
-                'action': action_type,
-                'timestamp': datetime.now(),
-                'success': result.success,
-                'details': result.data
-            })
+            result = handler(self, state, **kwargs)
+            # Reuse the result's own timestamp rather than reading the
+            # clock a second time
+            self.action_history.append(
+                ActionRecord(action_type, result.timestamp, result.success, result.data)
+            )
             
             if result.success:
                 state.add_action(action_type)
@@ -138,8 +232,9 @@ class ActionHandler:
                 notes=notes
             )
             
-            # Create follow-up task
-            self._handle_create_follow_up(state, task_type='callback_follow_up')
+            # Create follow-up task (raw call: the surrounding try already
+            # handles failures, so no second ActionResult wrapping needed)
+            self._create_follow_up_raw(state, 'callback_follow_up')
             
             return ActionResult(
                 success=True,
@@ -181,7 +276,9 @@ class ActionHandler:
                 return ActionResult(
                     success=True,
                     message="Lead information logged successfully",
-                    data={'lead_id': f"LEAD-{datetime.now().strftime('%Y%m%d%H%M%S')}"}
+                    # Nanosecond counter: no strftime cost, and unique at
+                    # sub-second rates where the old format collided
+                    data={'lead_id': f"LEAD-{time.time_ns():x}"}
                 )
             else:
                 return ActionResult(
@@ -195,22 +292,25 @@ class ActionHandler:
                 message=f"Lead logging error: {str(e)}"
             )
     
+    def _create_follow_up_raw(self, state: ConversationState, task_type: str) -> Dict[str, Any]:
+        """Create a follow-up task and return its raw details."""
+        return create_follow_up_task(
+            pharmacy_name=state.current_pharmacy_name,
+            contact_info={
+                'phone': state.phone_number,
+                'email': state.email_address
+            },
+            task_type=task_type
+        )
+
     def _handle_create_follow_up(self, state: ConversationState, **kwargs) -> ActionResult:
         """Handle creating follow-up tasks."""
-        
-        task_type = kwargs.get('task_type', 'general_follow_up')
-        contact_info = {
-            'phone': state.phone_number,
-            'email': state.email_address
-        }
-        
+
         try:
-            task_details = create_follow_up_task(
-                pharmacy_name=state.current_pharmacy_name,
-                contact_info=contact_info,
-                task_type=task_type
+            task_details = self._create_follow_up_raw(
+                state, kwargs.get('task_type', 'general_follow_up')
             )
-            
+
             return ActionResult(
                 success=True,
                 message="Follow-up task created",
@@ -226,18 +326,11 @@ class ActionHandler:
     def _handle_ask_for_email(self, state: ConversationState, **kwargs) -> ActionResult:
         """Generate response asking for email address."""
         
-        pharmacy_name = state.current_pharmacy_name
-        
-        messages = [
-            f"I'd be happy to send you detailed information about our services! Could you please provide your email address so I can send you everything {pharmacy_name} needs to know about Pharmesol?",
-            "To send you our comprehensive service information, I'll need your email address. What's the best email to reach you at?",
-            "I'd love to get you all the details about how Pharmesol can support your pharmacy. What email address should I send the information to?"
-        ]
-        
         # Choose message based on conversation context
-        message = messages[0]  # Default
-        if len(state.messages) > 3:
-            message = messages[1]  # Slightly different for longer conversations
+        if state.message_count > 3:
+            message = _ASK_FOR_EMAIL_MESSAGES[1]  # Slightly different for longer conversations
+        else:
+            message = _ASK_FOR_EMAIL_MESSAGES[0].format(pharmacy_name=state.current_pharmacy_name)
         
         return ActionResult(
             success=True,
@@ -248,11 +341,9 @@ class ActionHandler:
     def _handle_ask_for_callback_details(self, state: ConversationState, **kwargs) -> ActionResult:
         """Generate response asking for callback details."""
         
-        message = "I'd be happy to schedule a callback for you! What time works best - would you prefer morning or afternoon, and which day this week?"
-        
         return ActionResult(
             success=True,
-            message=message,
+            message=_CALLBACK_ASK_MSG,
             data={'action_required': 'collect_callback_details'}
         )
     
@@ -261,27 +352,14 @@ class ActionHandler:
         
         pharmacy = state.pharmacy_data
         subject = f"Following up on your call - {pharmacy.name}"
-        
-        volume_benefits = self._get_volume_benefits(pharmacy.pharmacy_type)
-        
-        body = f"""Dear {pharmacy.contact_person or 'there'},
-
-        Thank you for reaching out to us today. It's always great to hear from {pharmacy.name}.
-
-        Based on our conversation and your {pharmacy.rx_volume or 'significant'} monthly prescription volume, here's how Pharmesol can specifically support your pharmacy:
-
-        {volume_benefits}
-
-        Our team understands the unique challenges facing pharmacies in {pharmacy.location_display}, and we're committed to providing solutions that help you serve your community better.
-
-        I'll be preparing detailed pricing information tailored to your volume and will follow up within the next business day.
 
-        Thank you for considering Pharmesol as your distribution partner.
-
-        Best regards,
-        Pharmesol Sales Team
-        Phone: (555) 123-4567
-        Email: sales@pharmesol.com"""
+        body = _EXISTING_PHARMACY_BODY.format(
+            contact=pharmacy.contact_person or 'there',
+            pharmacy_name=pharmacy.name,
+            rx_volume=pharmacy.rx_volume or 'significant',
+            benefits=self._get_volume_benefits(pharmacy.pharmacy_type),
+            location=pharmacy.location_display
+        )
 
         return subject, body
     
@@ -294,64 +372,22 @@ class ActionHandler:
         
         # Determine benefits based on known volume
         if lead.rx_volume:
-            if lead.rx_volume >= 10000:
-                volume_benefits = self._get_volume_benefits(PharmacyType.HIGH_VOLUME)
-            elif lead.rx_volume >= 5000:
-                volume_benefits = self._get_volume_benefits(PharmacyType.MEDIUM_VOLUME)
-            else:
-                volume_benefits = self._get_volume_benefits(PharmacyType.LOW_VOLUME)
+            ptype = _VOLUME_TYPES[bisect_right(_VOLUME_THRESHOLDS, lead.rx_volume)]
         else:
-            volume_benefits = self._get_volume_benefits(PharmacyType.STARTUP)
+            ptype = PharmacyType.STARTUP
+        volume_benefits = self._get_volume_benefits(ptype)
         
-        body = f"""Dear {lead.contact_person or 'there'},
-
-        Thank you for your interest in Pharmesol's pharmaceutical distribution services.
-
-        Based on our conversation about {pharmacy_name}, here's what we can offer:
-
-        {volume_benefits}
-
-        We're excited about the opportunity to support {pharmacy_name}'s success and help you better serve your community.
-
-        Our team will follow up within the next few business days to discuss specific pricing and service details tailored to your needs.
-
-        Best regards,
-        Pharmesol Sales Team
-        Phone: (555) 123-4567
-        Email: sales@pharmesol.com"""
+        body = _NEW_LEAD_BODY.format(
+            contact=lead.contact_person or 'there',
+            pharmacy_name=pharmacy_name,
+            benefits=volume_benefits
+        )
 
         return subject, body
     
     def _get_volume_benefits(self, pharmacy_type: PharmacyType) -> str:
         """Get benefits text based on pharmacy type."""
-        
-        benefits_map = {
-            PharmacyType.HIGH_VOLUME: """• Premium tier pricing with significant volume discounts
-            • Dedicated account manager for personalized service
-            • Priority inventory allocation and emergency delivery
-            • Advanced inventory management tools and reporting
-            • Flexible payment terms and credit options""",
-            
-            PharmacyType.MEDIUM_VOLUME: """• Volume-based pricing tiers with competitive rates
-            • Reliable delivery scheduling (2-3 times per week)
-            • Account management support and regular check-ins
-            • Inventory optimization assistance
-            • Emergency delivery services when needed""",
-            
-            PharmacyType.LOW_VOLUME: """• Competitive pricing structure designed for growing pharmacies
-            • Flexible delivery options (weekly or bi-weekly)
-            • Growth-oriented service packages
-            • Inventory management support
-            • No minimum order requirements to start""",
-            
-            PharmacyType.STARTUP: """• Startup-friendly pricing with room to grow
-            • Flexible minimum order requirements
-            • Business development support and guidance
-            • Scalable solutions that adapt to your growth
-            • Educational resources for pharmacy operations"""
-        }
-        
-        return benefits_map.get(pharmacy_type, benefits_map[PharmacyType.STARTUP])
+        return _BENEFITS_MAP.get(pharmacy_type, _BENEFITS_MAP[PharmacyType.STARTUP])
     
     def _generate_callback_notes(self, state: ConversationState) -> str:
         """Generate notes for callback scheduling."""
@@ -370,7 +406,7 @@ class ActionHandler:
                 notes_parts.append(f"Estimated volume: {lead.rx_volume}/month")
             notes_parts.append(f"Lead completeness: {lead.completion_percentage}%")
         
-        notes_parts.append(f"Conversation length: {len(state.messages)} messages")
+        notes_parts.append(f"Conversation length: {state.message_count} messages")
         notes_parts.append(f"Actions taken: {', '.join(state.actions_taken) if state.actions_taken else 'None'}")
         
         return " | ".join(notes_parts)
@@ -378,18 +414,34 @@ class ActionHandler:
     def get_action_summary(self) -> Dict[str, Any]:
         """Get summary of all actions taken."""
         
-        total_actions = len(self.action_history)
-        successful_actions = sum(1 for action in self.action_history if action['success'])
-        
-        action_types = {}
-        for action in self.action_history:
-            action_type = action['action']
-            action_types[action_type] = action_types.get(action_type, 0) + 1
-        
+        # Single pass over the history: count totals, successes and
+        # per-type tallies together instead of re-walking it per metric
+        total_actions = 0
+        successful_actions = 0
+        action_types = Counter()
+        for record in self.action_history:
+            total_actions += 1
+            successful_actions += record.success
+            action_types[record.action] += 1
+
         return {
             'total_actions': total_actions,
             'successful_actions': successful_actions,
             'success_rate': successful_actions / total_actions if total_actions > 0 else 0,
-            'action_types': action_types,
-            'recent_actions': self.action_history[-5:] if self.action_history else []
-        }
\ No newline at end of file
+            'action_types': dict(action_types),
+            # Newest five in chronological order, without copying the
+            # whole deque
+            'recent_actions': list(islice(reversed(self.action_history), 5))[::-1]
+        }
+
+    # Dispatch table built once at class-definition time (hence defined
+    # after the handlers). Values are plain functions, so execute_action
+    # passes self explicitly.
+    _ACTIONS = {
+        'send_email': _handle_send_email,
+        'schedule_callback': _handle_schedule_callback,
+        'log_lead': _handle_log_lead,
+        'create_follow_up': _handle_create_follow_up,
+        'ask_for_email': _handle_ask_for_email,
+        'ask_for_callback_details': _handle_ask_for_callback_details
+    }
\ No newline at end of file
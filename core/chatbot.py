@@ -3,21 +3,78 @@ Main chatbot implementation with clean architecture and separation of concerns.
 This is the primary interface that coordinates all components.
 """
 
+import hashlib
 import os
+import secrets
+import string
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
 from typing import Optional, Dict, Any
-from datetime import datetime
 from dotenv import load_dotenv
-from openai import OpenAI
 
-from core.models import ConversationState, PharmacyData
+from core.models import ConversationState, PharmacyData, RECENT_MESSAGE_WINDOW
 from api.integration import PharmacyAPIClient, APIError
 from core.conversation_manager import ConversationFlowManager
 from core.action_handler import ActionHandler
 from utils.logging_config import setup_logging, DebugContext, monitor_performance
 from utils.prompt import SYSTEM_PROMPT
 
-# Load environment variables
-load_dotenv()
+# Load environment variables (skippable for deployments that inject their
+# own environment and don't want the .env file scan at import time)
+if not os.getenv('PHARMESOL_NO_DOTENV'):
+    load_dotenv()
+
+# Process-wide bound on simultaneous LLM requests. All chatbot instances
+# share one OpenAI rate limit, so the cap lives at module level; raise it
+# via OPENAI_MAX_CONCURRENCY when the account tier allows.
+_LLM_CONCURRENCY = threading.Semaphore(int(os.getenv('OPENAI_MAX_CONCURRENCY', '8')))
+
+# Size of the per-instance response cache for common conversational turns
+_RESPONSE_CACHE_MAX = 64
+
+# Log line icons. Emoji are on by default for readable console output;
+# set PHARMESOL_LOG_EMOJI=0 for plain ASCII markers when logs ship to a
+# collector and the multi-byte characters are just wasted bytes.
+_EMOJI = os.getenv('PHARMESOL_LOG_EMOJI', '1') != '0'
+_ICON_BOT = "🤖" if _EMOJI else "[BOT]"
+_ICON_END = "🏁" if _EMOJI else "[END]"
+_ICON_ERROR = "💥" if _EMOJI else "[ERROR]"
+_ICON_OK = "✨" if _EMOJI else "[OK]"
+
+# Greeting blurb per volume tier, highest threshold first; adding a tier
+# is a one-line table entry instead of another if/elif branch
+_VOLUME_TIERS = (
+    (10000, " With your high prescription volume, you'd be an excellent fit for our premium tier services."),
+    (5000, " Your prescription volume puts you in a great position to benefit from our bulk pricing."),
+    (0, " We can offer competitive pricing and room to grow with our flexible service options."),
+)
+
+@lru_cache(maxsize=256)
+def _known_pharmacy_greeting(name: str, location_info: str, volume_info: str) -> str:
+    """Assemble (and memoize) the greeting for a known pharmacy."""
+    return f"Great! I see you're calling from {name}{location_info}.{volume_info} How can Pharmesol help you today?"
+
+# Template for the per-turn strategy message, compiled once so each turn
+# only substitutes the dynamic fields instead of re-parsing an f-string.
+# The static SYSTEM_PROMPT stays in its own leading message (see
+# _generate_llm_response) and is deliberately not folded in here.
+_STRATEGY_TMPL = string.Template("""CURRENT CONTEXT:
+            $context
+
+            RESPONSE STRATEGY:
+            - Type: $response_type
+            - Personalization: $personalization_level
+            - Context: $strategy_hints
+            - Priority Actions: $priority_actions
+
+            INSTRUCTIONS:
+            - Use the context above to personalize your response
+            - Be natural and conversational
+            - If asking for information, explain why it's helpful
+            - Always offer next steps (email or callback)
+            """)
 
 class PharmacySalesChatbot:
     """
@@ -30,7 +87,40 @@ class PharmacySalesChatbot:
     - LLM interactions
     - Comprehensive logging
     """
-    
+
+    # Fixed attribute layout: multi-tenant servers spawn one instance per
+    # session, and slots drop the per-instance __dict__ overhead
+    __slots__ = (
+        'debug_mode', 'logger', 'conversation_id', 'openai_api_key',
+        'openai_model', 'llm_client', 'api_client', 'conversation_manager',
+        'action_handler', 'conversation_state', '_response_cache',
+        '_summary_cache', '_strategy_dispatch',
+    )
+
+    # One OpenAI client (and thus one HTTP connection pool) shared by all
+    # instances, so per-conversation construction doesn't redo TLS setup
+    _shared_client = None
+    _shared_client_key: Optional[str] = None
+    _client_lock = threading.Lock()
+
+    @classmethod
+    def _get_client(cls, api_key: str):
+        """Return the shared OpenAI client, building it on first use."""
+        with cls._client_lock:
+            if cls._shared_client is None or cls._shared_client_key != api_key:
+                # Imported here so importing this module (e.g. for --help or
+                # tooling) doesn't pay the openai/httpx import cost
+                from openai import OpenAI
+
+                # OPENAI_BASE_URL lets the same client target a self-hosted
+                # OpenAI-compatible endpoint (e.g. a local vLLM server)
+                cls._shared_client = OpenAI(
+                    api_key=api_key,
+                    base_url=os.getenv('OPENAI_BASE_URL')
+                )
+                cls._shared_client_key = api_key
+            return cls._shared_client
+
     def __init__(
         self,
         openai_api_key: Optional[str] = None,
@@ -46,13 +136,18 @@ class PharmacySalesChatbot:
             enable_debug: Enable detailed debug logging
         """
         
+        # No active conversation until start_conversation() is called
+        self.conversation_state = None
+
         # Set up logging first
         self.debug_mode = enable_debug
         log_level = "DEBUG" if enable_debug else log_level
         self.logger = setup_logging(level=log_level)
         
-        # Initialize conversation ID for this session
-        self.conversation_id = f"conv_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        # Initialize conversation ID for this session. Nanosecond timestamp
+        # plus a random suffix stays unique under concurrent call volume,
+        # where the old second-resolution strftime id collided.
+        self.conversation_id = f"conv_{time.time_ns():x}_{secrets.token_hex(3)}"
         self.logger.set_conversation_id(self.conversation_id)
         
         with DebugContext("chatbot_initialization") as debug:
@@ -66,14 +161,29 @@ class PharmacySalesChatbot:
             
             # Get model from environment variable
             self.openai_model = os.getenv('OPENAI_MODEL', 'gpt-4o-mini')
-            
-            self.llm_client = OpenAI(api_key=self.openai_api_key)
+
+            self.llm_client = self._get_client(self.openai_api_key)
             debug.log_step("OpenAI client initialized")
             
             # Initialize components
             self.api_client = PharmacyAPIClient()
             self.conversation_manager = ConversationFlowManager()
             self.action_handler = ActionHandler()
+
+            # LRU cache of LLM responses for low-personalization turns,
+            # keyed on strategy/tier/last-user-message (see _response_cache_key)
+            self._response_cache: OrderedDict = OrderedDict()
+
+            # (message_count, text) cache for the rolling history summary
+            self._summary_cache = (0, "")
+
+            # Dispatch table for direct-action response types; anything
+            # not listed here falls through to the LLM path
+            self._strategy_dispatch = {
+                'ask_for_email': self._handle_ask_for_email,
+                'send_email': self._handle_send_email,
+                'schedule_callback': self._handle_schedule_callback,
+            }
             
             debug.log_step("All components initialized")
             
@@ -83,7 +193,8 @@ class PharmacySalesChatbot:
             else:
                 debug.log_step("API health check failed - continuing with degraded functionality")
         
-        self.logger.logger.info(f"🤖 Chatbot initialized | Conversation ID: {self.conversation_id}")
+        # %-style args defer formatting until the logger knows INFO is enabled
+        self.logger.logger.info("%s Chatbot initialized | Conversation ID: %s", _ICON_BOT, self.conversation_id)
     
     @monitor_performance
     def start_conversation(self, phone_number: str) -> str:
@@ -96,11 +207,11 @@ class PharmacySalesChatbot:
         Returns:
             Initial greeting message
         """
-        
         with DebugContext("conversation_start") as debug:
             debug.log_step("Looking up pharmacy data")
-            
-            # Look up pharmacy information
+
+            # Look up pharmacy data; errors surface here so the existing
+            # degraded-mode handling stays in one place
             pharmacy_data = None
             try:
                 raw_pharmacy_data = self.api_client.find_pharmacy_by_phone(phone_number)
@@ -150,7 +261,7 @@ class PharmacySalesChatbot:
             Chatbot response
         """
         
-        if not hasattr(self, 'conversation_state'):
+        if self.conversation_state is None:
             raise RuntimeError("Conversation not started. Call start_conversation() first.")
         
         with DebugContext("message_processing") as debug:
@@ -158,19 +269,23 @@ class PharmacySalesChatbot:
             self.conversation_state.add_message("user", user_message)
             
             # Analyze user message
-            debug.log_step("Analyzing user message")
+            if self.debug_mode:
+                debug.log_step("Analyzing user message")
             analysis = self.conversation_manager.analyze_user_message(user_message)
-            
+
             self.logger.log_user_message(user_message, analysis)
-            debug.log_checkpoint("message_analyzed", {'intent': analysis['intent']})
-            
+            if self.debug_mode:
+                debug.log_checkpoint("message_analyzed", {'intent': analysis['intent']})
+
             # Update lead data if applicable
             if analysis['entities'] and self.conversation_state.lead_data:
                 self.conversation_manager.update_lead_data(analysis['entities'])
-                debug.log_step("Lead data updated")
-            
+                if self.debug_mode:
+                    debug.log_step("Lead data updated")
+
             # Determine response strategy
-            debug.log_step("Determining response strategy")
+            if self.debug_mode:
+                debug.log_step("Determining response strategy")
             strategy = self.conversation_manager.determine_response_strategy(analysis)
             
             # Handle immediate actions if needed
@@ -181,116 +296,179 @@ class PharmacySalesChatbot:
             self.logger.log_bot_response(response, strategy)
             
         return response
-    
+
+    def process_message_stream(self, user_message: str):
+        """
+        Process a user message, yielding the response incrementally.
+
+        Streaming variant of process_message for callers that want to
+        surface text as the LLM produces it instead of waiting for the
+        full completion. Direct actions (email, callback) still resolve
+        synchronously and arrive as a single chunk.
+
+        Args:
+            user_message: User's input message
+
+        Yields:
+            Response text fragments
+        """
+
+        if self.conversation_state is None:
+            raise RuntimeError("Conversation not started. Call start_conversation() first.")
+
+        with DebugContext("message_processing") as debug:
+            self.conversation_state.add_message("user", user_message)
+
+            analysis = self.conversation_manager.analyze_user_message(user_message)
+            self.logger.log_user_message(user_message, analysis)
+
+            if analysis['entities'] and self.conversation_state.lead_data:
+                self.conversation_manager.update_lead_data(analysis['entities'])
+
+            strategy = self.conversation_manager.determine_response_strategy(analysis)
+
+            if strategy['response_type'] in self._strategy_dispatch:
+                # Action turns produce their full message up front
+                response = self._handle_message_with_strategy(analysis, strategy, debug)
+                yield response
+                parts = [response]
+            else:
+                parts = []
+                for fragment in self._stream_llm_response(strategy, debug):
+                    parts.append(fragment)
+                    yield fragment
+
+            # Record the assembled response once the stream is done
+            response = "".join(parts)
+            self.conversation_state.add_message("assistant", response)
+            self.logger.log_bot_response(response, strategy)
+
     def _handle_message_with_strategy(
-        self, 
-        analysis: Dict[str, Any], 
+        self,
+        analysis: Dict[str, Any],
         strategy: Dict[str, Any],
         debug: DebugContext
     ) -> str:
         """Handle message processing based on determined strategy."""
-        
-        intent = analysis['intent']
-        entities = analysis['entities']
+
         response_type = strategy['response_type']
-        
-        debug.log_step(f"Handling {response_type} response")
-        
-        # Handle direct actions
-        if response_type == 'ask_for_email':
-            result = self.action_handler.execute_action(
-                'ask_for_email', 
-                self.conversation_state
-            )
-            return result.message
-        
-        elif response_type == 'send_email':
-            # Execute email sending
-            email_result = self.action_handler.execute_action(
-                'send_email',
-                self.conversation_state,
-                email=entities.get('email')
-            )
-            
-            self.logger.log_action_execution('send_email', email_result.success, email_result.data)
-            
-            if email_result.success:
-                # Log lead if it's a new one
-                if not self.conversation_state.is_known_pharmacy:
-                    self.action_handler.execute_action('log_lead', self.conversation_state)
-                
-                return email_result.message
-            else:
-                return "I apologize, but I'm having trouble sending the email right now. Could you please provide your email address again?"
-        
-        elif response_type == 'schedule_callback':
-            callback_result = self.action_handler.execute_action(
-                'schedule_callback',
-                self.conversation_state,
-                preferred_time=entities.get('preferred_time')
-            )
-            
-            self.logger.log_action_execution('schedule_callback', callback_result.success, callback_result.data)
-            return callback_result.message
-        
-        # For conversational responses, use LLM
+
+        if self.debug_mode:
+            debug.log_step(f"Handling {response_type} response")
+
+        # Direct actions dispatch through the table; everything else is a
+        # conversational turn and goes to the LLM
+        handler = self._strategy_dispatch.get(response_type)
+        if handler:
+            return handler(analysis, strategy, debug)
+
+        return self._generate_llm_response(strategy, debug)
+
+    def _handle_ask_for_email(
+        self, analysis: Dict[str, Any], strategy: Dict[str, Any], debug: DebugContext
+    ) -> str:
+        """Ask the caller for their email address."""
+        result = self.action_handler.execute_action(
+            'ask_for_email',
+            self.conversation_state
+        )
+        return result.message
+
+    def _handle_send_email(
+        self, analysis: Dict[str, Any], strategy: Dict[str, Any], debug: DebugContext
+    ) -> str:
+        """Execute email sending and log the lead when it's new."""
+        email_result = self.action_handler.execute_action(
+            'send_email',
+            self.conversation_state,
+            email=analysis['entities'].get('email')
+        )
+
+        self.logger.log_action_execution('send_email', email_result.success, email_result.data)
+
+        if email_result.success:
+            # Log lead if it's a new one
+            if not self.conversation_state.is_known_pharmacy:
+                self.action_handler.execute_action('log_lead', self.conversation_state)
+
+            return email_result.message
         else:
-            return self._generate_llm_response(strategy, debug)
+            return "I apologize, but I'm having trouble sending the email right now. Could you please provide your email address again?"
+
+    def _handle_schedule_callback(
+        self, analysis: Dict[str, Any], strategy: Dict[str, Any], debug: DebugContext
+    ) -> str:
+        """Schedule a callback for the caller."""
+        callback_result = self.action_handler.execute_action(
+            'schedule_callback',
+            self.conversation_state,
+            preferred_time=analysis['entities'].get('preferred_time')
+        )
+
+        self.logger.log_action_execution('schedule_callback', callback_result.success, callback_result.data)
+        return callback_result.message
     
+    def _response_cache_key(self, strategy: Dict[str, Any]) -> tuple:
+        """Cache key for a conversational turn: strategy, tier and last user message."""
+        state = self.conversation_state
+        tier = state.pharmacy_data.pharmacy_type.value if state.pharmacy_data else 'unknown'
+        last_user = next((m.content for m in reversed(state.messages) if m.role == 'user'), '')
+        digest = hashlib.blake2b(last_user.encode(), digest_size=12).hexdigest()
+        return (strategy['response_type'], tier, state.has_email, digest)
+
     @monitor_performance
     def _generate_llm_response(self, strategy: Dict[str, Any], debug: DebugContext) -> str:
         """Generate response using LLM with context."""
-        
+
+        # Low-personalization turns repeat across similar conversations
+        # (volume tiers, email asks); serve those from the cache. Highly
+        # personalized turns always go to the LLM.
+        cache_key = None
+        if strategy.get('personalization_level') != 'high':
+            cache_key = self._response_cache_key(strategy)
+            cached = self._response_cache.get(cache_key)
+            if cached is not None:
+                self._response_cache.move_to_end(cache_key)
+                if self.debug_mode:
+                    debug.log_step("Serving cached LLM response")
+                return cached
+
         try:
-            debug.log_step("Preparing LLM context")
-            
-            # Prepare system message with strategy context
-            context = self.conversation_manager.get_conversation_context()
-            strategy_hints = " | ".join(strategy.get('context_hints', []))
-            
-            enhanced_system_prompt = f"""{SYSTEM_PROMPT}
+            if self.debug_mode:
+                debug.log_step("Preparing LLM context")
 
-            CURRENT CONTEXT:
-            {context}
+            messages = self._build_llm_messages(strategy)
 
-            RESPONSE STRATEGY:
-            - Type: {strategy['response_type']}
-            - Personalization: {strategy['personalization_level']}
-            - Context: {strategy_hints}
-            - Priority Actions: {', '.join(strategy.get('priority_actions', []))}
+            if self.debug_mode:
+                debug.log_step("Calling LLM API")
+
+            # The strategy may override the default model (e.g. reserving a
+            # larger one for high-personalization turns)
+            model = strategy.get('model', self.openai_model)
+
+            # Make LLM API call, bounded by the process-wide concurrency cap
+            with _LLM_CONCURRENCY:
+                response = self.llm_client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    max_tokens=500,
+                    temperature=0.7
+                )
 
-            INSTRUCTIONS:
-            - Use the context above to personalize your response
-            - Be natural and conversational
-            - If asking for information, explain why it's helpful
-            - Always offer next steps (email or callback)
-            """
-            
-            # Prepare conversation history for LLM
-            messages = [{"role": "system", "content": enhanced_system_prompt}]
-            
-            # Add recent conversation history (last 6 messages to stay within context limits)
-            recent_messages = self.conversation_state.messages[-6:]
-            for msg in recent_messages:
-                messages.append({"role": msg.role, "content": msg.content})
-            
-            debug.log_step("Calling LLM API")
-            
-            # Make LLM API call
-            response = self.llm_client.chat.completions.create(
-                model=self.openai_model,
-                messages=messages,
-                max_tokens=500,
-                temperature=0.7
-            )
-            
             llm_response = response.choices[0].message.content.strip()
-            
+
             # Log LLM usage
             tokens_used = response.usage.total_tokens if response.usage else None
-            self.logger.log_llm_call(self.openai_model, tokens_used, True)
+            self.logger.log_llm_call(model, tokens_used, True)
             
-            debug.log_step("LLM response generated successfully")
+            if self.debug_mode:
+                debug.log_step("LLM response generated successfully")
+
+            if cache_key is not None:
+                self._response_cache[cache_key] = llm_response
+                if len(self._response_cache) > _RESPONSE_CACHE_MAX:
+                    self._response_cache.popitem(last=False)
+
             return llm_response
             
         except Exception as e:
@@ -299,25 +477,104 @@ class PharmacySalesChatbot:
             
             # Fallback response
             return self._generate_fallback_response()
-    
+
+    def _build_llm_messages(self, strategy: Dict[str, Any]) -> list:
+        """Assemble the LLM message list for a conversational turn."""
+
+        # Per-turn context and strategy ride in a trailing system message
+        # so the leading SYSTEM_PROMPT stays byte-identical across turns
+        # and the API's prompt-prefix cache can reuse it
+        context = self.conversation_manager.get_conversation_context()
+
+        strategy_context = _STRATEGY_TMPL.substitute(
+            context=context,
+            response_type=strategy['response_type'],
+            personalization_level=strategy['personalization_level'],
+            strategy_hints=strategy.get('context_hints_str', ''),
+            priority_actions=strategy.get('priority_actions_str', '')
+        )
+
+        # Prepare conversation history for LLM: stable prefix first
+        messages = [{"role": "system", "content": SYSTEM_PROMPT}]
+
+        # Replay only the newest messages verbatim (the state keeps a
+        # bounded deque of them, so no tail slice-copy); anything older
+        # is compressed into a one-line summary so prefill cost stays
+        # flat as the conversation grows
+        for msg in self.conversation_state.recent_messages:
+            messages.append({"role": msg.role, "content": msg.content})
+
+        older_summary = self._summarize_older_messages()
+        if older_summary:
+            messages.append({
+                "role": "system",
+                "content": f"EARLIER CONVERSATION (summarized): {older_summary}"
+            })
+
+        messages.append({"role": "system", "content": strategy_context})
+        return messages
+
+    def _stream_llm_response(self, strategy: Dict[str, Any], debug: DebugContext):
+        """Yield LLM response text incrementally for a conversational turn."""
+
+        model = strategy.get('model', self.openai_model)
+        try:
+            messages = self._build_llm_messages(strategy)
+
+            if self.debug_mode:
+                debug.log_step("Calling LLM API (streaming)")
+
+            with _LLM_CONCURRENCY:
+                stream = self.llm_client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    max_tokens=500,
+                    temperature=0.7,
+                    stream=True
+                )
+                for chunk in stream:
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if delta:
+                        yield delta
+
+            self.logger.log_llm_call(model, None, True)
+
+        except Exception as e:
+            self.logger.log_llm_call(model, None, False)
+            debug.log_step(f"LLM call failed: {e}")
+            yield self._generate_fallback_response()
+
+    def _summarize_older_messages(self) -> str:
+        """Rule-based digest of messages that fell out of the replay window."""
+        older = self.conversation_state.messages[:-RECENT_MESSAGE_WINDOW]
+        if not older:
+            return ""
+
+        # Rebuild only when older messages have accrued since the last turn
+        if len(older) != self._summary_cache[0]:
+            lines = [f"{msg.role}: {msg.content[:80]}" for msg in older]
+            self._summary_cache = (len(older), " / ".join(lines))
+
+        return self._summary_cache[1]
+
     def _generate_greeting(self, pharmacy_data: Optional[PharmacyData]) -> str:
         """Generate initial greeting based on pharmacy data."""
         
         if pharmacy_data:
-            # Known pharmacy greeting
+            # Known pharmacy greeting; repeat callers from the same
+            # pharmacy and tier hit the memoized assembly
             location_info = f" in {pharmacy_data.location_display}" if pharmacy_data.city else ""
-            
+
             volume_info = ""
             if pharmacy_data.rx_volume:
-                if pharmacy_data.rx_volume >= 10000:
-                    volume_info = " With your high prescription volume, you'd be an excellent fit for our premium tier services."
-                elif pharmacy_data.rx_volume >= 5000:
-                    volume_info = " Your prescription volume puts you in a great position to benefit from our bulk pricing."
-                else:
-                    volume_info = " We can offer competitive pricing and room to grow with our flexible service options."
-            
-            return f"Great! I see you're calling from {pharmacy_data.name}{location_info}.{volume_info} How can Pharmesol help you today?"
-        
+                volume_info = next(
+                    (msg for threshold, msg in _VOLUME_TIERS
+                     if pharmacy_data.rx_volume >= threshold),
+                    ""
+                )
+
+            return _known_pharmacy_greeting(pharmacy_data.name, location_info, volume_info)
+
         else:
             # New lead greeting
             return """Thank you for calling Pharmesol! I don't have your information in our system yet.
@@ -340,7 +597,7 @@ class PharmacySalesChatbot:
     def get_conversation_summary(self) -> Dict[str, Any]:
         """Get comprehensive conversation summary."""
         
-        if not hasattr(self, 'conversation_state'):
+        if self.conversation_state is None:
             return {'status': 'not_started'}
         
         state = self.conversation_state
@@ -349,8 +606,10 @@ class PharmacySalesChatbot:
             'conversation_id': self.conversation_id,
             'phone_number': state.phone_number,
             'status': state.status.value,
-            'message_count': len(state.messages),
-            'actions_taken': state.actions_taken.copy(),
+            'message_count': state.message_count,
+            # Immutable snapshot: cheaper than a list copy and signals
+            # read-only intent to summary consumers
+            'actions_taken': tuple(state.actions_taken),
             'is_known_pharmacy': state.is_known_pharmacy,
             'has_email': state.has_email,
             'started_at': state.started_at.isoformat(),
@@ -380,14 +639,19 @@ class PharmacySalesChatbot:
     def end_conversation(self) -> str:
         """End conversation with appropriate closing."""
         
-        if not hasattr(self, 'conversation_state'):
+        if self.conversation_state is None:
             return "Thank you for your interest in Pharmesol!"
         
         pharmacy_name = self.conversation_state.current_pharmacy_name
         closing = f"Thank you for your time today. I look forward to supporting {pharmacy_name}'s continued success with Pharmesol's reliable distribution services."
         
         # Log conversation end
-        self.logger.logger.info(f"🏁 CONVERSATION END | Summary: {len(self.conversation_state.messages)} messages, {len(self.conversation_state.actions_taken)} actions")
+        self.logger.logger.info(
+            "%s CONVERSATION END | Summary: %d messages, %d actions",
+            _ICON_END,
+            self.conversation_state.message_count,
+            len(self.conversation_state.actions_taken)
+        )
         
         return closing
     
@@ -401,6 +665,6 @@ class PharmacySalesChatbot:
             self.api_client.close()
         
         if exc_type:
-            self.logger.logger.error(f"💥 Chatbot session ended with error: {exc_type.__name__}: {exc_val}")
+            self.logger.logger.error("%s Chatbot session ended with error: %s: %s", _ICON_ERROR, exc_type.__name__, exc_val)
         else:
-            self.logger.logger.info("✨ Chatbot session ended successfully")
\ No newline at end of file
+            self.logger.logger.info("%s Chatbot session ended successfully", _ICON_OK)
\ No newline at end of file
@@ -7,7 +7,7 @@ import logging
 import re
 import json
 import os
-from typing import Optional, Tuple, List
+from typing import Optional, Tuple
 from openai import OpenAI
 from dotenv import load_dotenv
 from core.models import (
@@ -20,6 +20,59 @@ load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Extraction patterns compiled once at import; these run on every user
+# turn, so skipping the per-call re-cache lookup is worth the hoist
+_EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+
+# These match against the already-lowercased message (IGNORECASE forces
+# per-character case folding, and the caller lowercases once anyway);
+# display casing is recovered from the original message via match spans
+_NAME_RES = tuple(re.compile(p) for p in (
+    r"calling from ([^,.]+)",
+    r"i'm from ([^,.]+)",
+    r"at ([^,.]+pharmacy)",
+    r"([^,.]*pharmacy[^,.]*)",
+))
+
+_LOCATION_RES = tuple(re.compile(p) for p in (
+    r"in ([^,.]+,?\s*[a-z]{2})",
+    r"located in ([^,.]+)",
+    r"from ([^,.]+,?\s*[a-z]{2})",
+))
+
+# Translation table for stripping thousands separators from matched digits
+_STRIP_COMMA = {ord(','): None}
+
+_VOLUME_RE = re.compile(
+    r"(\d+,?\d*)\s*prescriptions"
+    r"|(\d+,?\d*)\s*rx"
+    r"|volume.*?(\d+,?\d*)"
+    r"|fill.*?(\d+,?\d*)"
+)
+
+# Intent keyword alternations. Deliberately plain substrings (no word
+# boundaries) so matching stays identical to the old `keyword in message`
+# checks, but the scan is one C-level pass instead of one per keyword.
+# Callers pass an already-lowercased message.
+_EMAIL_REQ_RE = re.compile('email|send me|mail me|information|details|send')
+_CALLBACK_RE = re.compile('callback|call back|call me|schedule|call|phone')
+_INTRO_RE = re.compile("pharmacy|calling from|i'm from|located|we fill|prescriptions")
+_PRICING_RE = re.compile('pricing|price|cost|rates|volume|discount|competitive')
+_GREETING_RE = re.compile('hello|hi|hey|good morning|good afternoon')
+
+# All intent alternations fused into one named-group pattern so keyword
+# classification is a single scan over the message instead of one per
+# intent. Groups are ordered by classification priority.
+_INTENT_SCAN_RE = re.compile('|'.join(
+    f"(?P<{name}>{pattern.pattern})" for name, pattern in (
+        ('email', _EMAIL_REQ_RE),
+        ('callback', _CALLBACK_RE),
+        ('intro', _INTRO_RE),
+        ('pricing', _PRICING_RE),
+        ('greeting', _GREETING_RE),
+    )
+))
+
 class ConversationFlowManager:
     """
     Manages conversation flow, state, and business logic.
@@ -33,10 +86,11 @@ class ConversationFlowManager:
     
     def __init__(self, openai_api_key: str = None):
         self.state: Optional[ConversationState] = None
-        self.email_patterns = [
-            r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        ]
-        
+
+        # (state version, context string); the context is rebuilt only
+        # when the state has actually mutated since the last call
+        self._context_cache: Tuple[int, str] = (-1, "")
+
         # Initialize OpenAI client for LLM extraction
         api_key = openai_api_key or os.getenv('OPENAI_API_KEY')
         if api_key:
@@ -68,7 +122,11 @@ class ConversationFlowManager:
             lead_data=lead_data,
             status=ConversationStatus.ACTIVE
         )
-        
+
+        # Fresh state starts over at version 0; drop any cached context
+        # from a previous conversation
+        self._context_cache = (-1, "")
+
         return self.state
     
     def analyze_user_message(self, message: str) -> dict:
@@ -102,7 +160,10 @@ class ConversationFlowManager:
                     {"role": "user", "content": extraction_prompt}
                 ],
                 max_tokens=300,
-                temperature=0.1
+                temperature=0.1,
+                # JSON mode guarantees parseable output, avoiding the retry
+                # or fallback cost of malformed extractions
+                response_format={"type": "json_object"}
             )
             
             extracted_json = response.choices[0].message.content.strip()
@@ -186,41 +247,45 @@ class ConversationFlowManager:
             'suggested_actions': []
         }
         
-        # Extract email addresses
-        emails = self._extract_emails(message)
-        if emails:
-            analysis['entities']['email'] = emails[0]
+        # Extract email address (first match; messages rarely carry more)
+        email = self._extract_email(message)
+        if email:
+            analysis['entities']['email'] = email
         
-        # Detect intents using keywords
-        if self._is_email_request(message_lower):
+        # Detect intents using keywords: one fused scan records every
+        # intent whose keywords appear, then the elif chain below applies
+        # the same priority order as before
+        hits = {m.lastgroup for m in _INTENT_SCAN_RE.finditer(message_lower)}
+
+        if 'email' in hits:
             analysis['intent'] = 'request_email'
             analysis['confidence'] = 0.8
-            if not emails and not (self.state and self.state.has_email):
+            if not email and not (self.state and self.state.has_email):
                 analysis['suggested_actions'].append('ask_for_email')
-        
-        elif self._is_callback_request(message_lower):
+
+        elif 'callback' in hits:
             analysis['intent'] = 'request_callback'
             analysis['confidence'] = 0.8
             analysis['entities']['preferred_time'] = self._extract_time_preference(message_lower)
         
-        elif self._is_pharmacy_introduction(message_lower):
+        elif 'intro' in hits:
             analysis['intent'] = 'pharmacy_introduction'
             analysis['confidence'] = 0.9
             
             # Extract pharmacy information
-            pharmacy_info = self._extract_pharmacy_info(message)
+            pharmacy_info = self._extract_pharmacy_info(message, message_lower)
             analysis['entities'].update(pharmacy_info)
         
-        elif self._is_pricing_inquiry(message_lower):
+        elif 'pricing' in hits:
             analysis['intent'] = 'pricing_inquiry'
             analysis['confidence'] = 0.7
             
             # Extract volume information
-            volume = self._extract_rx_volume(message)
+            volume = self._extract_rx_volume(message_lower)
             if volume:
                 analysis['entities']['rx_volume'] = volume
         
-        elif self._is_greeting(message_lower):
+        elif 'greeting' in hits:
             analysis['intent'] = 'greeting'
             analysis['confidence'] = 0.6
         
@@ -252,7 +317,10 @@ class ConversationFlowManager:
         
         if 'contact_person' in entities:
             lead.contact_person = entities['contact_person']
-        
+
+        # Lead fields feed the context string, so count this as a mutation
+        self.state.version += 1
+
         logger.debug(f"Updated lead data: {lead.completion_percentage}% complete")
     
     def determine_response_strategy(self, analysis: dict) -> dict:
@@ -300,6 +368,13 @@ class ConversationFlowManager:
             if self.state and self.state.pharmacy_data:
                 strategy['personalization_level'] = 'high'
         
+        # Routine turns run on the default (smaller) model; a larger model
+        # can be reserved for high-personalization turns via env override
+        if strategy['personalization_level'] == 'high':
+            premium_model = os.getenv('OPENAI_MODEL_PREMIUM')
+            if premium_model:
+                strategy['model'] = premium_model
+
         # Add context based on conversation state
         if self.state:
             if self.state.is_known_pharmacy:
@@ -309,7 +384,12 @@ class ConversationFlowManager:
                 strategy['context_hints'].append('new_lead')
                 if self.state.lead_data:
                     strategy['context_hints'].append(f"lead_completeness: {self.state.lead_data.completion_percentage}%")
-        
+
+        # Pre-join the list fields once here so the LLM prompt assembly
+        # just reads strings (and skips the join entirely when empty)
+        strategy['context_hints_str'] = " | ".join(strategy['context_hints']) if strategy['context_hints'] else ""
+        strategy['priority_actions_str'] = ", ".join(strategy['priority_actions']) if strategy['priority_actions'] else ""
+
         return strategy
     
     def get_conversation_context(self) -> str:
@@ -321,7 +401,10 @@ class ConversationFlowManager:
         """
         if not self.state:
             return "No active conversation"
-        
+
+        if self._context_cache[0] == self.state.version:
+            return self._context_cache[1]
+
         context_parts = [
             f"PHONE: {self.state.phone_number}",
             f"STATUS: {self.state.status.value}",
@@ -349,96 +432,72 @@ class ConversationFlowManager:
             if lead.rx_volume:
                 context_parts.append(f"VOLUME: {lead.rx_volume}")
         
-        return " | ".join(context_parts)
+        context = " | ".join(context_parts)
+        self._context_cache = (self.state.version, context)
+        return context
     
-    def _extract_emails(self, text: str) -> List[str]:
-        """Extract email addresses from text."""
-        emails = []
-        for pattern in self.email_patterns:
-            matches = re.findall(pattern, text)
-            emails.extend(matches)
-        return list(set(emails))  # Remove duplicates
+    def _extract_email(self, text: str) -> Optional[str]:
+        """Extract the first email address from text, if any."""
+        match = _EMAIL_RE.search(text)
+        return match.group(0) if match else None
     
     def _is_email_request(self, message: str) -> bool:
         """Check if message is requesting email information."""
-        keywords = ['email', 'send me', 'mail me', 'information', 'details', 'send']
-        return any(keyword in message for keyword in keywords)
-    
+        return _EMAIL_REQ_RE.search(message) is not None
+
     def _is_callback_request(self, message: str) -> bool:
         """Check if message is requesting a callback."""
-        keywords = ['callback', 'call back', 'call me', 'schedule', 'call', 'phone']
-        return any(keyword in message for keyword in keywords)
-    
+        return _CALLBACK_RE.search(message) is not None
+
     def _is_pharmacy_introduction(self, message: str) -> bool:
         """Check if message is introducing pharmacy information."""
-        indicators = [
-            'pharmacy' in message, 'calling from' in message,
-            "i'm from" in message, 'located' in message,
-            'we fill' in message, 'prescriptions' in message
-        ]
-        return any(indicators)
-    
+        return _INTRO_RE.search(message) is not None
+
     def _is_pricing_inquiry(self, message: str) -> bool:
         """Check if message is asking about pricing."""
-        keywords = ['pricing', 'price', 'cost', 'rates', 'volume', 'discount', 'competitive']
-        return any(keyword in message for keyword in keywords)
-    
+        return _PRICING_RE.search(message) is not None
+
     def _is_greeting(self, message: str) -> bool:
         """Check if message is a greeting."""
-        greetings = ['hello', 'hi', 'hey', 'good morning', 'good afternoon']
-        return any(greeting in message for greeting in greetings)
+        return _GREETING_RE.search(message) is not None
     
-    def _extract_pharmacy_info(self, message: str) -> dict:
-        """Extract pharmacy information from message."""
+    def _extract_pharmacy_info(self, message: str, message_lower: str) -> dict:
+        """Extract pharmacy information, matching on the lowercased message.
+
+        Matches run against message_lower, and the extracted text is read
+        back out of the original message by span so display casing (e.g.
+        "HealthFirst Pharmacy") survives.
+        """
         info = {}
-        
+
         # Extract pharmacy name (simple pattern matching)
-        name_patterns = [
-            r"calling from ([^,.]+)",
-            r"i'm from ([^,.]+)",
-            r"at ([^,.]+pharmacy)",
-            r"([^,.]*pharmacy[^,.]*)"
-        ]
-        
-        for pattern in name_patterns:
-            match = re.search(pattern, message, re.IGNORECASE)
+        for pattern in _NAME_RES:
+            match = pattern.search(message_lower)
             if match:
-                info['pharmacy_name'] = match.group(1).strip()
+                start, end = match.span(1)
+                info['pharmacy_name'] = message[start:end].strip()
                 break
-        
+
         # Extract location
-        location_patterns = [
-            r"in ([^,.]+,?\s*[A-Z]{2})",
-            r"located in ([^,.]+)",
-            r"from ([^,.]+,?\s*[A-Z]{2})"
-        ]
-        
-        for pattern in location_patterns:
-            match = re.search(pattern, message, re.IGNORECASE)
+        for pattern in _LOCATION_RES:
+            match = pattern.search(message_lower)
             if match:
-                info['location'] = match.group(1).strip()
+                start, end = match.span(1)
+                info['location'] = message[start:end].strip()
                 break
-        
+
         return info
     
     def _extract_rx_volume(self, message: str) -> Optional[int]:
-        """Extract prescription volume from message."""
-        patterns = [
-            r"(\d+,?\d*)\s*prescriptions",
-            r"(\d+,?\d*)\s*rx",
-            r"volume.*?(\d+,?\d*)",
-            r"fill.*?(\d+,?\d*)"
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, message, re.IGNORECASE)
-            if match:
-                volume_str = match.group(1).replace(',', '')
-                try:
-                    return int(volume_str)
-                except ValueError:
-                    continue
-        return None
+        """Extract prescription volume from a lowercased message."""
+        match = _VOLUME_RE.search(message)
+        if not match:
+            return None
+        volume_str = next(g for g in match.groups() if g)
+        try:
+            return int(volume_str.translate(_STRIP_COMMA))
+        except ValueError:
+            return None
     
     def _extract_time_preference(self, message: str) -> Optional[str]:
         """Extract time preference from message."""
@@ -3,11 +3,18 @@ Data models and structures for the pharmacy sales chatbot.
 Provides clean abstractions for pharmacy data, conversations, and actions.
 """
 
+import operator
+from bisect import bisect_right
+from collections import deque
 from dataclasses import dataclass, field
-from typing import Optional, Dict, List, Any
+from typing import Optional, ClassVar, Deque, Dict, List, Any, Set, Tuple
 from enum import Enum
 from datetime import datetime
 
+# How many trailing messages the LLM replays verbatim each turn; older
+# messages are summarized instead (see PharmacySalesChatbot)
+RECENT_MESSAGE_WINDOW = 4
+
 class ConversationStatus(Enum):
     """Status of the current conversation."""
     ACTIVE = "active"
@@ -22,7 +29,20 @@ class PharmacyType(Enum):
     LOW_VOLUME = "low_volume"  # 1,000-4,999 per month
     STARTUP = "startup"  # Less than 1,000 per month
 
-@dataclass
+# Tier boundaries for monthly prescription volume; bisect_right into
+# _VOLUME_CLASSES replaces a comparison ladder, and batch callers can map
+# classify_rx_volume over API rows without duplicating the thresholds
+_VOLUME_BOUNDS = (1000, 5000, 10000)
+_VOLUME_CLASSES = (PharmacyType.STARTUP, PharmacyType.LOW_VOLUME,
+                   PharmacyType.MEDIUM_VOLUME, PharmacyType.HIGH_VOLUME)
+
+def classify_rx_volume(rx_volume: Optional[int]) -> PharmacyType:
+    """Map a monthly prescription volume to its PharmacyType tier."""
+    if not rx_volume:
+        return PharmacyType.STARTUP
+    return _VOLUME_CLASSES[bisect_right(_VOLUME_BOUNDS, rx_volume)]
+
+@dataclass(slots=True)
 class PharmacyData:
     """Clean data structure for pharmacy information."""
     name: str
@@ -32,47 +52,46 @@ class PharmacyData:
     rx_volume: Optional[int] = None
     email: Optional[str] = None
     contact_person: Optional[str] = None
-    
-    @property
-    def location_display(self) -> str:
-        """Get formatted location string."""
+    # Formatted location, derived once at construction since city/state
+    # never change afterwards; reads are then plain slot loads
+    location_display: str = field(init=False)
+    # Volume classification, likewise fixed at construction
+    pharmacy_type: PharmacyType = field(init=False)
+
+    def __post_init__(self):
+        self.pharmacy_type = classify_rx_volume(self.rx_volume)
+
         if self.city and self.state:
-            return f"{self.city}, {self.state}"
+            self.location_display = f"{self.city}, {self.state}"
         elif self.city:
-            return self.city
+            self.location_display = self.city
         elif self.state:
-            return self.state
-        return "Unknown location"
-    
-    @property
-    def pharmacy_type(self) -> PharmacyType:
-        """Classify pharmacy by volume."""
-        if not self.rx_volume:
-            return PharmacyType.STARTUP
-        
-        if self.rx_volume >= 10000:
-            return PharmacyType.HIGH_VOLUME
-        elif self.rx_volume >= 5000:
-            return PharmacyType.MEDIUM_VOLUME
-        elif self.rx_volume >= 1000:
-            return PharmacyType.LOW_VOLUME
+            self.location_display = self.state
         else:
-            return PharmacyType.STARTUP
-    
+            self.location_display = "Unknown location"
+
+    # API key and default for each field, in declaration order, so
+    # from_api_response is one tuple scan instead of seven inline lookups
+    _API_FIELDS: ClassVar[Tuple[Tuple[str, Any], ...]] = (
+        ('name', 'Unknown Pharmacy'),
+        ('phone', ''),
+        ('city', None),
+        ('state', None),
+        ('rxVolume', None),
+        ('email', None),
+        ('contactPerson', None),
+    )
+
     @classmethod
     def from_api_response(cls, api_data: Dict[str, Any]) -> 'PharmacyData':
         """Create PharmacyData from API response."""
-        return cls(
-            name=api_data.get('name', 'Unknown Pharmacy'),
-            phone=api_data.get('phone', ''),
-            city=api_data.get('city'),
-            state=api_data.get('state'),
-            rx_volume=api_data.get('rxVolume'),
-            email=api_data.get('email'),
-            contact_person=api_data.get('contactPerson')
-        )
+        # Positional call into the generated __init__ (fields in
+        # declaration order) to skip keyword-argument processing; this
+        # runs once per API row
+        get = api_data.get
+        return cls(*(get(key, default) for key, default in cls._API_FIELDS))
 
-@dataclass
+@dataclass(slots=True)
 class LeadData:
     """Structure for new lead information collection."""
     phone: str
@@ -89,17 +108,20 @@ class LeadData:
         """Check if we have minimum required information."""
         return bool(self.pharmacy_name and self.email)
     
+    # The five tracked intake fields, fetched in one call; each is worth
+    # 20% of completion
+    _LEAD_FIELDS = operator.attrgetter(
+        'pharmacy_name', 'contact_person', 'email', 'location', 'rx_volume'
+    )
+
     @property
     def completion_percentage(self) -> int:
         """Calculate how complete the lead data is."""
-        fields = [
-            self.pharmacy_name, self.contact_person, self.email,
-            self.location, self.rx_volume
-        ]
-        completed = sum(1 for field in fields if field)
-        return int((completed / len(fields)) * 100)
-
-@dataclass
+        name, contact, email, location, volume = LeadData._LEAD_FIELDS(self)
+        return (bool(name) + bool(contact) + bool(email)
+                + bool(location) + bool(volume)) * 20
+
+@dataclass(slots=True)
 class ConversationMessage:
     """Structure for conversation messages."""
     role: str  # 'user' or 'assistant'
@@ -107,7 +129,7 @@ class ConversationMessage:
     timestamp: datetime = field(default_factory=datetime.now)
     metadata: Dict[str, Any] = field(default_factory=dict)
 
-@dataclass
+@dataclass(slots=True)
 class ConversationState:
     """Complete state of a conversation session."""
     phone_number: str
@@ -115,9 +137,25 @@ class ConversationState:
     pharmacy_data: Optional[PharmacyData] = None
     lead_data: Optional[LeadData] = None
     messages: List[ConversationMessage] = field(default_factory=list)
+    # Bounded view of the newest messages, kept alongside the full log so
+    # the per-turn LLM path never has to slice-copy the tail of `messages`
+    recent_messages: Deque[ConversationMessage] = field(
+        default_factory=lambda: deque(maxlen=RECENT_MESSAGE_WINDOW)
+    )
     actions_taken: List[str] = field(default_factory=list)
+    # Set mirror of actions_taken for O(1) duplicate checks in add_action;
+    # the list keeps the insertion order callers display
+    _actions_taken_set: Set[str] = field(default_factory=set)
     started_at: datetime = field(default_factory=datetime.now)
+    # Bumped on every mutation so derived views (e.g. the conversation
+    # context string) can cache against it with an integer compare
+    version: int = 0
     
+    @property
+    def message_count(self) -> int:
+        """Number of messages exchanged, independent of container choice."""
+        return len(self.messages)
+
     @property
     def is_known_pharmacy(self) -> bool:
         """Check if this is a known pharmacy."""
@@ -152,19 +190,26 @@ class ConversationState:
     
     def add_message(self, role: str, content: str, metadata: Dict[str, Any] = None):
         """Add a message to the conversation."""
+        # Pass the timestamp explicitly rather than routing through the
+        # default_factory machinery on every message
         message = ConversationMessage(
             role=role,
             content=content,
+            timestamp=datetime.now(),
             metadata=metadata or {}
         )
         self.messages.append(message)
+        self.recent_messages.append(message)
+        self.version += 1
     
     def add_action(self, action: str):
         """Record an action taken during the conversation."""
-        if action not in self.actions_taken:
+        if action not in self._actions_taken_set:
+            self._actions_taken_set.add(action)
             self.actions_taken.append(action)
+            self.version += 1
 
-@dataclass
+@dataclass(slots=True)
 class ActionRequest:
     """Structure for requested actions (email, callback, etc.)."""
     action_type: str
@@ -4,6 +4,7 @@ Comprehensive demonstration of the pharmacy sales chatbot.
 Shows clean architecture, proper error handling, and excellent usability.
 """
 
+import os
 import sys
 import time
 from pathlib import Path
@@ -16,6 +17,15 @@ from core.chatbot import PharmacySalesChatbot
 from api.integration import PharmacyAPIClient
 from utils.logging_config import DebugContext
 
+# Readability pauses only make sense for a human watching a terminal;
+# skip them on automated/piped runs or when PHARMESOL_FAST_DEMO is set
+_PACED = sys.stdout.isatty() and not os.environ.get('PHARMESOL_FAST_DEMO')
+
+def _pause(seconds: float = 0.5):
+    """Brief pause between conversation turns, skipped in fast mode."""
+    if _PACED:
+        time.sleep(seconds)
+
 def print_section_header(title: str, emoji: str = "🎯"):
     """Print a clean section header."""
     print(f"\n{emoji} {title}")
@@ -98,7 +108,7 @@ def demo_known_pharmacy_conversation():
                 response = chatbot.process_message(user_message)
                 print_conversation_message("Pharmesol Agent", response, "🤖")
                 
-                time.sleep(0.5)  # Brief pause for readability
+                _pause()  # Brief pause for readability
             
             # Show conversation summary
             print(f"\n📋 Conversation Summary:")
@@ -140,8 +150,8 @@ def demo_new_lead_conversation():
                 response = chatbot.process_message(user_message)
                 print_conversation_message("Pharmesol Agent", response, "🤖")
                 
-                time.sleep(0.5)
-            
+                _pause()
+
             # Show lead summary
             print(f"\n📋 Lead Generation Summary:")
             summary = chatbot.get_conversation_summary()
@@ -232,21 +242,21 @@ def show_architecture_benefits():
         ("🎯 Usability", "Simple API with powerful features underneath")
     ]
     
-    for title, description in benefits:
-        print(f"{title}: {description}")
-    
-    print(f"\n📦 Component Structure:")
     components = [
         "models.py - Data structures and business objects",
         "api_client.py - Clean API interaction with retry logic",
-        "conversation_manager.py - Conversation flow and intent analysis", 
+        "conversation_manager.py - Conversation flow and intent analysis",
         "action_handler.py - Business action execution",
         "logging_config.py - Comprehensive logging and debugging",
         "chatbot.py - Main orchestrator that brings it all together"
     ]
-    
-    for component in components:
-        print(f"   • {component}")
+
+    # This section is pure static output, so assemble it once and hand
+    # stdout a single write instead of one locked print per line
+    lines = [f"{title}: {description}" for title, description in benefits]
+    lines.append("\n📦 Component Structure:")
+    lines.extend(f"   • {component}" for component in components)
+    sys.stdout.write("\n".join(lines) + "\n")
 
 def main():
     """Run comprehensive demonstration."""
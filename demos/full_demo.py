@@ -42,8 +42,12 @@ def run_complete_demo():
         return
     
     print(f"✅ Connected to API. Found {len(all_pharmacies)} pharmacies:")
-    for i, p in enumerate(all_pharmacies, 1):
-        print(f"   {i}. {p.get('name', 'Unknown')} - {p.get('phone', 'No phone')}")
+    # Pull each column out once (tight C loops), then zip-iterate the
+    # parallel lists instead of re-dispatching .get per field per row
+    names = [p.get('name', 'Unknown') for p in all_pharmacies]
+    phones = [p.get('phone', 'No phone') for p in all_pharmacies]
+    for i, (name, phone) in enumerate(zip(names, phones), 1):
+        print(f"   {i}. {name} - {phone}")
     
     # Demo 1: Known Pharmacy Call
     print("\n" + "="*60)
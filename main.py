@@ -5,6 +5,7 @@ Demonstrates the functionality with sample scenarios.
 
 import os
 import sys
+from functools import lru_cache
 from typing import Optional
 from dotenv import load_dotenv
 from api.integration import PharmacyLookup
@@ -13,6 +14,12 @@ from api.llm import PharmacyChatbot
 # Load environment variables from .env file
 load_dotenv()
 
+@lru_cache(maxsize=1)
+def _get_lookup() -> PharmacyLookup:
+    """Shared pharmacy lookup client, so every simulated call reuses one
+    HTTP session instead of constructing a fresh client per scenario."""
+    return PharmacyLookup()
+
 def simulate_call(phone_number: str, openai_api_key: Optional[str] = None, interactive: bool = False):
     """
     Simulate an inbound call from a pharmacy.
@@ -27,8 +34,8 @@ def simulate_call(phone_number: str, openai_api_key: Optional[str] = None, inter
     print("="*80)
     
     # Initialize components
-    lookup = PharmacyLookup()
-    
+    lookup = _get_lookup()
+
     try:
         chatbot = PharmacyChatbot(openai_api_key)
     except ValueError as e:
@@ -142,7 +149,7 @@ def run_sample_scenarios():
     
     # First, let's check what pharmacies are available in the API
     print("🔍 Checking available pharmacies in API...")
-    lookup = PharmacyLookup()
+    lookup = _get_lookup()
     all_pharmacies = lookup.get_all_pharmacies()
     
     if all_pharmacies:
@@ -9,6 +9,7 @@ import json
 import requests
 from api.integration import PharmacyLookup
 from api.llm import PharmacyChatbot
+from utils.prompt import CONVERSATION_PROMPTS
 from utils.function_calls import send_email, schedule_callback, log_lead_information
 
 class TestPharmacyLookup(unittest.TestCase):
@@ -98,6 +99,70 @@ class TestPharmacyLookup(unittest.TestCase):
         
         self.assertIsNone(result)
 
+class TestPharmacyCaching(unittest.TestCase):
+    """Test cases for the pharmacies collection cache (TTL, ETag, stale serve)."""
+
+    _PHARMACIES = [
+        {"id": "1", "name": "Central Pharmacy", "phone": "+1234567890"}
+    ]
+
+    def setUp(self):
+        # A dedicated base URL keeps this instance off the shared disk
+        # cache; the session and disk writes are mocked out entirely
+        self.lookup = PharmacyLookup(api_base_url="https://cache-test.invalid")
+        self.lookup.session = Mock()
+        self.lookup._save_disk_cache = Mock()
+
+    def _response(self, status_code=200, etag='"v1"'):
+        response = Mock()
+        response.status_code = status_code
+        response.json.return_value = self._PHARMACIES
+        response.headers = {'ETag': etag}
+        response.raise_for_status.return_value = None
+        return response
+
+    def test_fresh_cache_skips_network(self):
+        """Test that repeated fetches within the TTL reuse the first response."""
+        self.lookup.session.get.return_value = self._response()
+
+        first = self.lookup._fetch_pharmacies()
+        second = self.lookup._fetch_pharmacies()
+
+        self.assertEqual(first, self._PHARMACIES)
+        self.assertIs(second, first)
+        self.assertEqual(self.lookup.session.get.call_count, 1)
+
+    def test_expired_cache_revalidates_with_etag(self):
+        """Test that an expired cache sends If-None-Match and a 304 keeps it."""
+        self.lookup.session.get.return_value = self._response()
+        first = self.lookup._fetch_pharmacies()
+
+        # Expire the TTL and have the API report the data unchanged
+        self.lookup._cache['ts'] = 0.0
+        self.lookup.session.get.return_value = self._response(status_code=304)
+
+        second = self.lookup._fetch_pharmacies()
+
+        self.assertIs(second, first)
+        headers = self.lookup.session.get.call_args.kwargs['headers']
+        self.assertEqual(headers.get('If-None-Match'), '"v1"')
+
+    def test_stale_cache_served_after_fetch_failure(self):
+        """Test that a failed refresh falls back to the stale cached data."""
+        self.lookup.session.get.return_value = self._response()
+        first = self.lookup._fetch_pharmacies()
+
+        self.lookup._cache['ts'] = 0.0
+        self.lookup.session.get.side_effect = requests.exceptions.RequestException("down")
+
+        self.assertIs(self.lookup._fetch_pharmacies(), first)
+
+    def test_no_cache_and_fetch_failure_returns_none(self):
+        """Test that a fetch failure with nothing cached returns None."""
+        self.lookup.session.get.side_effect = requests.exceptions.RequestException("down")
+
+        self.assertIsNone(self.lookup._fetch_pharmacies())
+
 class TestPharmacyChatbot(unittest.TestCase):
     """Test cases for chatbot functionality."""
     
@@ -208,6 +273,91 @@ class TestPharmacyChatbot(unittest.TestCase):
         self.assertEqual(summary['lead_data'], {"email": "test@test.com"})
         self.assertGreater(summary['conversation_length'], 0)
 
+class TestToolCallDispatch(unittest.TestCase):
+    """Test cases for LLM tool-call parsing and dispatch."""
+
+    def setUp(self):
+        self.chatbot = PharmacyChatbot(openai_api_key="test_key")
+        self.chatbot.client = Mock()
+        self.chatbot.start_conversation("+1555555555", None)
+
+    def test_dispatch_send_email(self):
+        """Test that a send_email tool call sends to the requested address."""
+        with patch('api.llm.send_email') as mock_send_email:
+            mock_send_email.return_value = True
+
+            response = self.chatbot._dispatch_tool_calls(
+                [('send_email', {'recipient_email': 'test@pharmacy.com'})],
+                "Please send me information", None
+            )
+
+        mock_send_email.assert_called_once()
+        self.assertIn("test@pharmacy.com", response)
+
+    def test_dispatch_schedule_callback(self):
+        """Test that a schedule_callback tool call books the callback."""
+        with patch('api.llm.schedule_callback') as mock_schedule, \
+             patch('api.llm.create_follow_up_task') as mock_follow_up:
+
+            mock_schedule.return_value = {"callback_id": "CB-123", "status": "scheduled"}
+            mock_follow_up.return_value = {"task_id": "TASK-123"}
+
+            response = self.chatbot._dispatch_tool_calls(
+                [('schedule_callback', {'preferred_time': 'tomorrow morning'})],
+                "Please call me back tomorrow morning", None
+            )
+
+        mock_schedule.assert_called_once()
+        self.assertIn("scheduled a callback", response)
+
+    def test_dispatch_log_lead_information(self):
+        """Test that a lead-logging-only turn stores the lead and keeps talking."""
+        response = self.chatbot._dispatch_tool_calls(
+            [('log_lead_information', {
+                'pharmacy_name': 'Springfield Pharmacy',
+                'email': 'manager@springfieldpharm.com'
+            })],
+            "I'm calling from Springfield Pharmacy", None
+        )
+
+        self.assertEqual(self.chatbot.lead_data['pharmacy_name'], 'Springfield Pharmacy')
+        self.assertEqual(self.chatbot.lead_data['email'], 'manager@springfieldpharm.com')
+        self.assertEqual(response, CONVERSATION_PROMPTS['suggest_next_steps'])
+
+    def test_dispatch_unknown_tool(self):
+        """Test that an unknown tool name is ignored without raising."""
+        response = self.chatbot._dispatch_tool_calls(
+            [('not_a_real_tool', {})], "Hello", None
+        )
+
+        self.assertEqual(response, CONVERSATION_PROMPTS['suggest_next_steps'])
+
+    def test_parse_malformed_tool_args(self):
+        """Test that malformed or missing argument JSON degrades to empty args."""
+        self.assertEqual(PharmacyChatbot._parse_tool_args('{not valid json'), {})
+        self.assertEqual(PharmacyChatbot._parse_tool_args(None), {})
+
+    def test_process_message_routes_tool_calls(self):
+        """Test that process_user_message parses and dispatches tool calls."""
+        tool_call = Mock()
+        tool_call.function.name = 'schedule_callback'
+        tool_call.function.arguments = '{"preferred_time": "tomorrow morning"}'
+        message = Mock(tool_calls=[tool_call])
+        self.chatbot.client.chat.completions.create.return_value = Mock(
+            choices=[Mock(message=message)]
+        )
+
+        with patch('api.llm.schedule_callback') as mock_schedule, \
+             patch('api.llm.create_follow_up_task') as mock_follow_up:
+
+            mock_schedule.return_value = {"callback_id": "CB-123", "status": "scheduled"}
+            mock_follow_up.return_value = {"task_id": "TASK-123"}
+
+            response = self.chatbot.process_user_message("Please call me back tomorrow morning")
+
+        mock_schedule.assert_called_once()
+        self.assertIn("scheduled a callback", response)
+
 class TestMockFunctions(unittest.TestCase):
     """Test cases for mock utility functions."""
     
@@ -335,7 +485,9 @@ def run_all_tests():
     
     # Add all test classes
     suite.addTests(loader.loadTestsFromTestCase(TestPharmacyLookup))
+    suite.addTests(loader.loadTestsFromTestCase(TestPharmacyCaching))
     suite.addTests(loader.loadTestsFromTestCase(TestPharmacyChatbot))
+    suite.addTests(loader.loadTestsFromTestCase(TestToolCallDispatch))
     suite.addTests(loader.loadTestsFromTestCase(TestMockFunctions))
     suite.addTests(loader.loadTestsFromTestCase(TestEdgeCases))
     
@@ -11,6 +11,65 @@ from typing import Dict, Any
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# OpenAI tool definitions for the actions above, so the chatbot can let the
+# model decide in the same request whether a turn needs an action instead of
+# making a separate extraction call first
+TOOL_SCHEMAS = [
+    {
+        "type": "function",
+        "function": {
+            "name": "send_email",
+            "description": "Send detailed Pharmesol service information to the caller's email address. Use when the caller asks for information by email.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "recipient_email": {
+                        "type": "string",
+                        "description": "The caller's email address, if they provided one"
+                    }
+                },
+                "required": []
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "schedule_callback",
+            "description": "Schedule a callback from a Pharmesol sales representative. Use when the caller asks to be called back.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "preferred_time": {
+                        "type": "string",
+                        "description": "The caller's preferred callback time, e.g. 'tomorrow morning'"
+                    }
+                },
+                "required": []
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "log_lead_information",
+            "description": "Record contact or pharmacy details the caller shared, such as their name, email, phone, pharmacy name, location or prescription volume.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "email": {"type": "string", "description": "Contact email address"},
+                    "phone": {"type": "string", "description": "Contact phone number"},
+                    "name": {"type": "string", "description": "Contact person's name"},
+                    "pharmacy_name": {"type": "string", "description": "Name of the pharmacy"},
+                    "location": {"type": "string", "description": "Pharmacy location"},
+                    "rx_volume": {"type": "integer", "description": "Monthly prescription volume"}
+                },
+                "required": []
+            }
+        }
+    }
+]
+
 def send_email(recipient_email: str, subject: str, body: str, sender: str = "sales@pharmesol.com") -> bool:
     """
     Mock function to simulate sending an email.
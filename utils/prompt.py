@@ -3,6 +3,8 @@ System prompts and templates for the pharmacy sales chatbot.
 Contains all LLM prompts and conversation templates.
 """
 
+from functools import lru_cache
+
 # Base system prompt for the sales chatbot
 SYSTEM_PROMPT = """You are a professional sales representative for Pharmesol, a pharmaceutical distribution company specializing in supporting high-volume pharmacies. You are handling inbound calls from pharmacies.
 
@@ -137,27 +139,20 @@ RESPONSE_TEMPLATES = {
     "email_confirmation": "Great! I'll send you detailed information about our services to {email_address}. You should receive it within the next few minutes."
 }
 
-def format_location_info(pharmacy_data):
-    """Format location information for greeting."""
-    if not pharmacy_data:
-        return ""
-    
-    location_parts = []
-    if pharmacy_data.get('city'):
-        location_parts.append(pharmacy_data['city'])
-    if pharmacy_data.get('state'):
-        location_parts.append(pharmacy_data['state'])
-    
+@lru_cache(maxsize=128)
+def _location_info(city, state):
+    """Build the location fragment from scalar fields (cacheable)."""
+    location_parts = [part for part in (city, state) if part]
     if location_parts:
         return f" in {', '.join(location_parts)}"
     return ""
 
-def format_rx_volume_info(pharmacy_data):
-    """Format Rx volume information for greeting."""
-    if not pharmacy_data or not pharmacy_data.get('rxVolume'):
+@lru_cache(maxsize=128)
+def _rx_volume_info(rx_volume):
+    """Build the Rx volume message from the scalar volume (cacheable)."""
+    if not rx_volume:
         return "I'd love to learn more about your prescription volume to see how we can best support you."
-    
-    rx_volume = pharmacy_data['rxVolume']
+
     if rx_volume >= 10000:
         return RX_VOLUME_MESSAGES["high"]
     elif rx_volume >= 5000:
@@ -167,6 +162,19 @@ def format_rx_volume_info(pharmacy_data):
     else:
         return RX_VOLUME_MESSAGES["unknown"]
 
+def format_location_info(pharmacy_data):
+    """Format location information for greeting."""
+    if not pharmacy_data:
+        return ""
+    return _location_info(pharmacy_data.get('city'), pharmacy_data.get('state'))
+
+def format_rx_volume_info(pharmacy_data):
+    """Format Rx volume information for greeting."""
+    if not pharmacy_data:
+        return _rx_volume_info(None)
+    return _rx_volume_info(pharmacy_data.get('rxVolume'))
+
+@lru_cache(maxsize=64)
 def get_rx_volume_benefits(rx_volume):
     """Get specific benefits based on Rx volume."""
     if not rx_volume or rx_volume == 0: